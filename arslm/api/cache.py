@@ -0,0 +1,407 @@
+"""
+Response caching for the ARSLM API client.
+
+Stores API responses keyed by a hash of the request so identical
+deterministic calls can be answered locally, and optionally by prompt
+embedding so paraphrased prompts can reuse an earlier answer.
+"""
+
+import copy
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+import numpy as np
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+# Supported per-call cache modes
+CACHE_MODES = ('readWrite', 'readOnly', 'writeOnly', None)
+
+
+def make_cache_key(endpoint: str, payload: Dict[str, Any]) -> str:
+    """
+    Build a cache key from an endpoint and its request payload.
+
+    Args:
+        endpoint: API endpoint path
+        payload: Request payload
+
+    Returns:
+        SHA-256 hex digest of the canonical JSON request
+    """
+    canonical = json.dumps(
+        {'endpoint': endpoint, 'payload': payload},
+        sort_keys=True,
+        separators=(',', ':'),
+        ensure_ascii=False
+    )
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """
+    In-memory LRU cache with time-to-live expiry.
+
+    Example:
+        >>> cache = ResponseCache(maxsize=128, ttl=60)
+        >>> cache.put("key", {"text": "Hello"})
+        >>> cache.get("key")
+        {'text': 'Hello'}
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = 1800):
+        """
+        Initialize response cache.
+
+        Args:
+            maxsize: Maximum number of cached responses
+            ttl: Entry lifetime in seconds (None for no expiry)
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+
+        self._data: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a copy of the cached response, or None on miss."""
+        with self._lock:
+            entry = self._data.get(key)
+
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at is not None and expires_at < time.monotonic():
+                    del self._data[key]
+                    entry = None
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._data.move_to_end(key)
+            self.hits += 1
+
+        return copy.deepcopy(value)
+
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        """Store a response, evicting the least recently used entry."""
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+
+        with self._lock:
+            self._data[key] = (expires_at, copy.deepcopy(value))
+            self._data.move_to_end(key)
+
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all entries and reset statistics."""
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters and current size."""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self._data)
+            }
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class DiskCache:
+    """
+    SQLite-backed response cache with time-to-live expiry.
+
+    Survives process restarts and can be shared by several processes
+    using the same file (the database runs in WAL mode). Responses are
+    stored as JSON, zstd-compressed when ``zstandard`` is installed and
+    the encoded response is larger than ``compress_min_size`` bytes.
+    When full, the oldest inserted entries are evicted first.
+
+    Example:
+        >>> cache = DiskCache("~/.cache/arslm/responses.db", ttl=86400)
+        >>> cache.put("key", {"text": "Hello"})
+        >>> cache.get("key")
+        {'text': 'Hello'}
+    """
+
+    # Blob prefixes identifying how the stored JSON is encoded
+    _RAW = b'j'
+    _ZSTD = b'z'
+
+    def __init__(
+        self,
+        path: str,
+        maxsize: int = 1024,
+        ttl: Optional[float] = 1800,
+        compress_min_size: int = 1024
+    ):
+        """
+        Initialize disk cache.
+
+        Args:
+            path: Path of the SQLite database file
+            maxsize: Maximum number of cached responses
+            ttl: Entry lifetime in seconds (None for no expiry)
+            compress_min_size: Minimum encoded size in bytes to compress
+        """
+        self.path = str(Path(path).expanduser())
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.compress_min_size = compress_min_size
+
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            self.path,
+            timeout=30,
+            check_same_thread=False,
+            isolation_level=None
+        )
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS responses ('
+            'key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL)'
+        )
+
+        if zstandard is not None:
+            self._compressor = zstandard.ZstdCompressor()
+            self._decompressor = zstandard.ZstdDecompressor()
+
+        self.hits = 0
+        self.misses = 0
+
+    def _encode(self, value: Dict[str, Any]) -> bytes:
+        data = json.dumps(value, ensure_ascii=False).encode('utf-8')
+        if zstandard is not None and len(data) >= self.compress_min_size:
+            return self._ZSTD + self._compressor.compress(data)
+        return self._RAW + data
+
+    def _decode(self, blob: bytes) -> Optional[Dict[str, Any]]:
+        prefix, data = blob[:1], blob[1:]
+        if prefix == self._ZSTD:
+            if zstandard is None:
+                # Written by a process with zstandard installed
+                return None
+            data = self._decompressor.decompress(data)
+        return json.loads(data)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached response, or None on miss."""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT value, expires_at FROM responses WHERE key = ?',
+                (key,)
+            ).fetchone()
+
+            value = None
+            if row is not None:
+                blob, expires_at = row
+                if expires_at is not None and expires_at < time.time():
+                    self._conn.execute(
+                        'DELETE FROM responses WHERE key = ?', (key,)
+                    )
+                else:
+                    value = self._decode(blob)
+
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        return value
+
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        """Store a response, evicting the oldest entries when full."""
+        expires_at = time.time() + self.ttl if self.ttl is not None else None
+        blob = self._encode(value)
+
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO responses VALUES (?, ?, ?)',
+                (key, blob, expires_at)
+            )
+            self._conn.execute(
+                'DELETE FROM responses WHERE rowid IN ('
+                'SELECT rowid FROM responses ORDER BY rowid DESC '
+                'LIMIT -1 OFFSET ?)',
+                (self.maxsize,)
+            )
+
+    def clear(self) -> None:
+        """Remove all entries and reset statistics."""
+        with self._lock:
+            self._conn.execute('DELETE FROM responses')
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters and current size."""
+        with self._lock:
+            size = self._conn.execute(
+                'SELECT COUNT(*) FROM responses'
+            ).fetchone()[0]
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': size
+            }
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def __len__(self) -> int:
+        return self.stats()['size']
+
+
+class SemanticCache:
+    """
+    Nearest-neighbour cache over prompt embeddings.
+
+    Embeddings are L2-normalized and kept in a fixed-size ring buffer, so
+    a lookup is a single matrix-vector product (cosine similarity) over
+    at most ``maxsize`` vectors. Each entry may carry a ``scope`` (e.g.
+    the rest of the request payload): a lookup only matches entries of
+    the same scope. Other vector indexes (faiss, hnswlib) can be plugged
+    in by subclassing and overriding ``get``/``put``.
+
+    Example:
+        >>> cache = SemanticCache(maxsize=256)
+        >>> cache.put(embedding, {"text": "Hello"}, scope="s1")
+        >>> cache.get(similar_embedding, threshold=0.92, scope="s1")
+        {'text': 'Hello'}
+        >>> cache.get(similar_embedding, threshold=0.92, scope="s2")
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        """
+        Initialize semantic cache.
+
+        Args:
+            maxsize: Maximum number of cached responses
+        """
+        self.maxsize = maxsize
+
+        self._vectors: Optional[np.ndarray] = None
+        self._values: list = [None] * maxsize
+        self._scopes = np.zeros(maxsize, dtype=np.int64)
+        self._size = 0
+        self._next = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _normalize(embedding) -> np.ndarray:
+        vec = np.asarray(embedding, dtype=np.float32).reshape(-1)
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm > 0 else vec
+
+    @staticmethod
+    def _scope_id(scope: Optional[str]) -> int:
+        # Compared as one int64 array in get(), not per entry in Python
+        return hash(scope)
+
+    def get(
+        self,
+        embedding,
+        threshold: float = 0.92,
+        scope: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Return the response of the most similar cached prompt.
+
+        Args:
+            embedding: Prompt embedding vector
+            threshold: Minimum cosine similarity for a hit
+            scope: Only entries stored with this scope can match
+
+        Returns:
+            Copy of the cached response, or None on miss
+        """
+        query = self._normalize(embedding)
+
+        with self._lock:
+            if self._size == 0:
+                self.misses += 1
+                return None
+
+            scores = self._vectors[:self._size] @ query
+            scores[self._scopes[:self._size] != self._scope_id(scope)] = -np.inf
+            best = int(np.argmax(scores))
+
+            if scores[best] < threshold:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            value = self._values[best]
+
+        return copy.deepcopy(value)
+
+    def put(
+        self,
+        embedding,
+        response: Dict[str, Any],
+        scope: Optional[str] = None
+    ) -> None:
+        """Store a response, overwriting the oldest entry when full."""
+        vec = self._normalize(embedding)
+
+        with self._lock:
+            if self._vectors is None:
+                self._vectors = np.zeros(
+                    (self.maxsize, vec.shape[0]),
+                    dtype=np.float32
+                )
+
+            self._vectors[self._next] = vec
+            self._values[self._next] = copy.deepcopy(response)
+            self._scopes[self._next] = self._scope_id(scope)
+            self._next = (self._next + 1) % self.maxsize
+            self._size = min(self._size + 1, self.maxsize)
+
+    def clear(self) -> None:
+        """Remove all entries and reset statistics."""
+        with self._lock:
+            self._vectors = None
+            self._values = [None] * self.maxsize
+            self._scopes[:] = 0
+            self._size = 0
+            self._next = 0
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters and current size."""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': self._size
+            }
+
+    def __len__(self) -> int:
+        return self._size
@@ -4,11 +4,61 @@ API Client for ARSLM.
 Client for interacting with ARSLM REST API.
 """
 
+import re
 import requests
-from typing import Dict, List, Optional, Any
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+)
 from pathlib import Path
 import json
 
+from arslm.api.cache import (
+    CACHE_MODES,
+    DiskCache,
+    ResponseCache,
+    SemanticCache,
+    make_cache_key,
+)
+
+
+try:
+    import orjson
+    
+    def _dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj)
+    
+    _loads = orjson.loads
+
+except ImportError:
+    # orjson not available, fall back to the standard library
+    def _dumps(obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False).encode('utf-8')
+    
+    _loads = json.loads
+
+
+def _check_cache_mode(cache: Optional[str]) -> None:
+    """Raise ValueError for an unknown cache mode."""
+    if cache not in CACHE_MODES:
+        raise ValueError(
+            f"Unknown cache mode: {cache}. Expected one of {CACHE_MODES}"
+        )
+
+
+# Prompts asking for an action rather than an answer are never served
+# from the semantic cache
+DEFAULT_SEMANTIC_DENY_PATTERN = (
+    r'^\s*[/!]|\b(delete|remove|reset|clear|send|execute|run|update|create)\b'
+)
+
 
 class ARSLMClient:
     """
@@ -18,13 +68,42 @@ class ARSLMClient:
         >>> client = ARSLMClient("http://localhost:8000")
         >>> response = client.chat("Hello!", session_id="user123")
         >>> print(response['text'])
+    
+    Deterministic requests (``temperature=0``) are answered from a local
+    exact-match cache when the same payload was already sent. Passing an
+    ``embed_fn`` additionally enables a semantic cache for deterministic
+    ``chat`` calls that reuses answers to paraphrased messages sent with
+    the same session and options.
+    
+    Example:
+        >>> client = ARSLMClient(embed_fn=model.encode)
+        >>> client.chat("What is ARSLM?", session_id="user123", temperature=0)
+        >>> client.chat("what's arslm", session_id="user123", temperature=0)  # cache hit
     """
     
+    # Fixed endpoints whose URLs and prepared requests are built once
+    ENDPOINTS = (
+        '/api/v1/chat',
+        '/api/v1/generate',
+        '/api/v1/history',
+        '/health',
+        '/api/v1/model/info',
+    )
+    
     def __init__(
         self,
         base_url: str = "http://localhost:8000",
         api_key: Optional[str] = None,
-        timeout: int = 30
+        timeout: int = 30,
+        pool_maxsize: int = 32,
+        max_retries: int = 3,
+        cache_size: int = 1024,
+        cache_ttl: Optional[float] = 1800,
+        cache_path: Optional[str] = None,
+        embed_fn: Optional[Callable[[str], Any]] = None,
+        semantic_cache: Optional[SemanticCache] = None,
+        semantic_threshold: float = 0.92,
+        semantic_deny_pattern: Optional[str] = DEFAULT_SEMANTIC_DENY_PATTERN
     ):
         """
         Initialize ARSLM client.
@@ -33,37 +112,330 @@ class ARSLMClient:
             base_url: Base URL of ARSLM API
             api_key: API key for authentication (if required)
             timeout: Request timeout in seconds
+            pool_maxsize: Number of keep-alive connections kept per host
+            max_retries: Retries on connection errors and 429/5xx responses
+            cache_size: Maximum number of cached responses
+            cache_ttl: Lifetime of cached responses in seconds
+            cache_path: SQLite file backing the exact-match cache, so
+                cached responses persist across restarts (in memory if None)
+            embed_fn: Function mapping a message to an embedding vector;
+                enables the semantic cache for deterministic chat
+            semantic_cache: Semantic cache to use (defaults to a new
+                SemanticCache when embed_fn is given)
+            semantic_threshold: Minimum cosine similarity for a semantic hit
+            semantic_deny_pattern: Regex of messages never served from
+                the semantic cache (None to allow all)
         """
         self.base_url = base_url.rstrip('/')
         self.api_key = api_key
         self.timeout = timeout
         
         self.session = requests.Session()
+        
+        # Size the keep-alive pool for concurrent callers and retry
+        # transient failures on an already pooled connection
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=0.2,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(['GET', 'POST', 'DELETE'])
+        )
+        adapter = HTTPAdapter(
+            pool_connections=pool_maxsize,
+            pool_maxsize=pool_maxsize,
+            pool_block=False,
+            max_retries=retry
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        
         if api_key:
             self.session.headers['Authorization'] = f'Bearer {api_key}'
         self.session.headers['Content-Type'] = 'application/json'
+        
+        self._urls = {
+            endpoint: f"{self.base_url}{endpoint}"
+            for endpoint in self.ENDPOINTS
+        }
+        self._prepared: Dict[tuple, requests.PreparedRequest] = {}
+        self._send_settings: Dict[tuple, Dict[str, Any]] = {}
+        
+        # Payload templates copied per call; key order matches the API
+        self._chat_tmpl = {
+            'message': None,
+            'session_id': None,
+            'temperature': 1.0,
+            'max_length': 100
+        }
+        self._generate_tmpl = {
+            'prompt': None,
+            'max_length': 100,
+            'temperature': 1.0,
+            'top_k': 50,
+            'top_p': 0.95,
+            'num_return_sequences': 1
+        }
+        
+        if cache_path is not None:
+            self._cache = DiskCache(cache_path, maxsize=cache_size, ttl=cache_ttl)
+        else:
+            self._cache = ResponseCache(maxsize=cache_size, ttl=cache_ttl)
+        
+        self.embed_fn = embed_fn
+        if embed_fn is not None and semantic_cache is None:
+            semantic_cache = SemanticCache(maxsize=cache_size)
+        self._semantic_cache = semantic_cache
+        self.semantic_threshold = semantic_threshold
+        self._semantic_deny = (
+            re.compile(semantic_deny_pattern, re.IGNORECASE)
+            if semantic_deny_pattern else None
+        )
     
-    def _request(
+    def _prepare(self, method: str, endpoint: str) -> requests.PreparedRequest:
+        """
+        Return a fresh copy of the prepared request for endpoint.
+        
+        Requests to fixed endpoints are prepared (URL parsing, session
+        header and auth merging) once and cloned on later calls. Session
+        headers changed afterwards are not picked up by existing templates.
+        """
+        key = (method, endpoint)
+        template = self._prepared.get(key)
+        
+        if template is None:
+            url = self._urls.get(endpoint) or f"{self.base_url}{endpoint}"
+            template = self.session.prepare_request(requests.Request(method, url))
+            if endpoint not in self._urls:
+                return template
+            self._prepared[key] = template
+        
+        return template.copy()
+    
+    def _settings(self, endpoint: str, url: str, stream: bool) -> Dict[str, Any]:
+        """
+        Return the send() settings for url (proxies, CA bundle, stream).
+        
+        session.send() skips the environment merge session.request()
+        does, so proxy and REQUESTS_CA_BUNDLE variables are merged here,
+        once per fixed endpoint like the prepared request templates.
+        """
+        key = (endpoint, stream)
+        settings = self._send_settings.get(key)
+        
+        if settings is None:
+            settings = self.session.merge_environment_settings(
+                url, {}, stream, None, None
+            )
+            if endpoint in self._urls:
+                self._send_settings[key] = settings
+        
+        return settings
+    
+    def _send(
         self,
         method: str,
         endpoint: str,
+        data: Optional[bytes] = None,
+        stream: bool = False,
         **kwargs
-    ) -> Dict[str, Any]:
-        """Make HTTP request to API."""
-        url = f"{self.base_url}{endpoint}"
-        
-        try:
+    ) -> requests.Response:
+        """Send request and raise for HTTP error status."""
+        if kwargs:
+            # Query parameters and other options go through the regular
+            # session path
             response = self.session.request(
                 method,
-                url,
+                f"{self.base_url}{endpoint}",
+                data=data,
                 timeout=self.timeout,
+                stream=stream,
                 **kwargs
             )
-            response.raise_for_status()
-            return response.json()
+        else:
+            prepared = self._prepare(method, endpoint)
+            if data is not None:
+                prepared.prepare_body(data, None)
+            response = self.session.send(
+                prepared,
+                timeout=self.timeout,
+                **self._settings(endpoint, prepared.url, stream)
+            )
+        
+        response.raise_for_status()
+        return response
+    
+    def _request(
+        self,
+        method: str,
+        endpoint: str,
+        json: Optional[Dict[str, Any]] = None,
+        data: Optional[bytes] = None,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """
+        Make HTTP request to API.
+        
+        JSON payloads are encoded once here (with orjson when available)
+        and sent as raw bytes; the session already carries the
+        Content-Type header.
+        """
+        if json is not None:
+            data = _dumps(json)
+        
+        try:
+            response = self._send(method, endpoint, data=data, **kwargs)
+            return _loads(response.content)
         
         except requests.exceptions.RequestException as e:
             raise ARSLMClientError(f"API request failed: {str(e)}")
+        
+        except ValueError as e:
+            raise ARSLMClientError(f"Invalid API response: {str(e)}")
+    
+    def _cached_request(
+        self,
+        endpoint: str,
+        payload: Dict[str, Any],
+        cache: Optional[str] = 'readWrite',
+        semantic_field: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        POST payload to endpoint through the response caches.
+        
+        Only deterministic payloads (temperature of 0) are cached, since
+        sampled responses are expected to differ between calls. When
+        semantic_field names the payload text and a semantic cache is
+        configured, it is consulted after an exact-match miss; entries
+        only match requests to the same endpoint whose other payload
+        fields (session, context, options) are identical.
+        """
+        _check_cache_mode(cache)
+        
+        if cache is None:
+            return self._request('POST', endpoint, json=payload)
+        
+        read = cache in ('readWrite', 'readOnly')
+        write = cache in ('readWrite', 'writeOnly')
+        
+        if payload.get('temperature', 1.0) > 0:
+            return self._request('POST', endpoint, json=payload)
+        
+        key = make_cache_key(endpoint, payload)
+        if read:
+            cached = self._cache.get(key)
+            if cached is not None:
+                return cached
+        
+        embedding = None
+        semantic_text = payload.get(semantic_field) if semantic_field else None
+        if semantic_text is not None and self._use_semantic_cache(semantic_text):
+            embedding = self.embed_fn(semantic_text)
+            scope = make_cache_key(endpoint, {
+                field: value for field, value in payload.items()
+                if field != semantic_field
+            })
+            if read:
+                cached = self._semantic_cache.get(
+                    embedding,
+                    threshold=self.semantic_threshold,
+                    scope=scope
+                )
+                if cached is not None:
+                    return cached
+        
+        response = self._request('POST', endpoint, json=payload)
+        
+        if write:
+            self._cache.put(key, response)
+            if embedding is not None:
+                self._semantic_cache.put(embedding, response, scope=scope)
+        
+        return response
+    
+    def _stream_request(
+        self,
+        endpoint: str,
+        payload: Dict[str, Any]
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        POST payload and yield newline-delimited JSON chunks as they arrive.
+        
+        A server that does not stream returns a single JSON body, which
+        is yielded as one chunk.
+        """
+        try:
+            with self._send(
+                'POST',
+                endpoint,
+                data=_dumps(payload),
+                stream=True
+            ) as response:
+                for line in response.iter_lines():
+                    if line:
+                        yield _loads(line)
+        
+        except requests.exceptions.RequestException as e:
+            raise ARSLMClientError(f"API request failed: {str(e)}")
+        
+        except ValueError as e:
+            raise ARSLMClientError(f"Invalid API response: {str(e)}")
+    
+    def _cached_stream(
+        self,
+        endpoint: str,
+        payload: Dict[str, Any],
+        cache: Optional[str] = 'readWrite'
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream endpoint through the exact-match cache.
+        
+        On a hit the cached chunks are replayed; deterministic streams are
+        recorded and cached once fully consumed.
+        """
+        key = None
+        if cache is not None and payload.get('temperature', 1.0) <= 0:
+            key = make_cache_key(endpoint, payload)
+            if cache in ('readWrite', 'readOnly'):
+                cached = self._cache.get(key)
+                if cached is not None:
+                    yield from cached['chunks']
+                    return
+        
+        record = key is not None and cache in ('readWrite', 'writeOnly')
+        chunks = []
+        
+        for chunk in self._stream_request(endpoint, payload):
+            if record:
+                chunks.append(chunk)
+            yield chunk
+        
+        if record:
+            self._cache.put(key, {'chunks': chunks})
+    
+    def _use_semantic_cache(self, text: str) -> bool:
+        """Check whether a message may be served from the semantic cache."""
+        if self._semantic_cache is None:
+            return False
+        return not (self._semantic_deny and self._semantic_deny.search(text))
+    
+    def clear_cache(self) -> None:
+        """Remove all cached responses."""
+        self._cache.clear()
+        if self._semantic_cache is not None:
+            self._semantic_cache.clear()
+    
+    def cache_stats(self) -> Dict[str, int]:
+        """
+        Get response cache statistics.
+        
+        Returns:
+            Dictionary with 'hits', 'misses' and 'size', plus a
+            'semantic' entry when the semantic cache is enabled
+        """
+        stats = self._cache.stats()
+        if self._semantic_cache is not None:
+            stats['semantic'] = self._semantic_cache.stats()
+        return stats
     
     def chat(
         self,
@@ -71,7 +443,8 @@ class ARSLMClient:
         session_id: str,
         context: Optional[Dict[str, Any]] = None,
         temperature: float = 1.0,
-        max_length: int = 100
+        max_length: int = 100,
+        cache: Optional[str] = 'readWrite'
     ) -> Dict[str, Any]:
         """
         Send chat message.
@@ -82,21 +455,77 @@ class ARSLMClient:
             context: Additional context
             temperature: Sampling temperature
             max_length: Maximum response length
+            cache: Cache mode ('readWrite', 'readOnly', 'writeOnly' or None)
             
         Returns:
             API response with 'text' field
         """
-        payload = {
-            'message': message,
-            'session_id': session_id,
-            'temperature': temperature,
-            'max_length': max_length
-        }
+        payload = self._chat_payload(
+            message, session_id, context, temperature, max_length
+        )
+        
+        return self._cached_request(
+            '/api/v1/chat',
+            payload,
+            cache,
+            semantic_field='message'
+        )
+    
+    def chat_stream(
+        self,
+        message: str,
+        session_id: str,
+        context: Optional[Dict[str, Any]] = None,
+        temperature: float = 1.0,
+        max_length: int = 100,
+        cache: Optional[str] = 'readWrite'
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Send chat message and stream the response.
+        
+        Args:
+            message: User message
+            session_id: Session identifier
+            context: Additional context
+            temperature: Sampling temperature
+            max_length: Maximum response length
+            cache: Cache mode ('readWrite', 'readOnly', 'writeOnly' or None)
+            
+        Returns:
+            Iterator over response chunks as they are received
+        
+        Example:
+            >>> for chunk in client.chat_stream("Hello!", session_id="user123"):
+            ...     print(chunk['text'], end="")
+        """
+        _check_cache_mode(cache)
+        
+        payload = self._chat_payload(
+            message, session_id, context, temperature, max_length
+        )
+        payload['stream'] = True
+        
+        return self._cached_stream('/api/v1/chat', payload, cache)
+    
+    def _chat_payload(
+        self,
+        message: str,
+        session_id: str,
+        context: Optional[Dict[str, Any]],
+        temperature: float,
+        max_length: int
+    ) -> Dict[str, Any]:
+        """Build the request payload for the chat endpoint."""
+        payload = self._chat_tmpl.copy()
+        payload['message'] = message
+        payload['session_id'] = session_id
+        payload['temperature'] = temperature
+        payload['max_length'] = max_length
         
         if context:
             payload['context'] = context
         
-        return self._request('POST', '/api/v1/chat', json=payload)
+        return payload
     
     def generate(
         self,
@@ -105,7 +534,8 @@ class ARSLMClient:
         temperature: float = 1.0,
         top_k: int = 50,
         top_p: float = 0.95,
-        num_return_sequences: int = 1
+        num_return_sequences: int = 1,
+        cache: Optional[str] = 'readWrite'
     ) -> Dict[str, Any]:
         """
         Generate text from prompt.
@@ -117,20 +547,70 @@ class ARSLMClient:
             top_k: Top-k sampling
             top_p: Nucleus sampling
             num_return_sequences: Number of sequences
+            cache: Cache mode ('readWrite', 'readOnly', 'writeOnly' or None)
             
         Returns:
             Generated text(s)
         """
-        payload = {
-            'prompt': prompt,
-            'max_length': max_length,
-            'temperature': temperature,
-            'top_k': top_k,
-            'top_p': top_p,
-            'num_return_sequences': num_return_sequences
-        }
+        payload = self._generate_payload(
+            prompt, max_length, temperature, top_k, top_p, num_return_sequences
+        )
         
-        return self._request('POST', '/api/v1/generate', json=payload)
+        return self._cached_request('/api/v1/generate', payload, cache)
+    
+    def generate_stream(
+        self,
+        prompt: str,
+        max_length: int = 100,
+        temperature: float = 1.0,
+        top_k: int = 50,
+        top_p: float = 0.95,
+        num_return_sequences: int = 1,
+        cache: Optional[str] = 'readWrite'
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Generate text from prompt and stream the result.
+        
+        Args:
+            prompt: Input prompt
+            max_length: Maximum length
+            temperature: Sampling temperature
+            top_k: Top-k sampling
+            top_p: Nucleus sampling
+            num_return_sequences: Number of sequences
+            cache: Cache mode ('readWrite', 'readOnly', 'writeOnly' or None)
+            
+        Returns:
+            Iterator over generated chunks as they are received
+        """
+        _check_cache_mode(cache)
+        
+        payload = self._generate_payload(
+            prompt, max_length, temperature, top_k, top_p, num_return_sequences
+        )
+        payload['stream'] = True
+        
+        return self._cached_stream('/api/v1/generate', payload, cache)
+    
+    def _generate_payload(
+        self,
+        prompt: str,
+        max_length: int,
+        temperature: float,
+        top_k: int,
+        top_p: float,
+        num_return_sequences: int
+    ) -> Dict[str, Any]:
+        """Build the request payload for the generate endpoint."""
+        payload = self._generate_tmpl.copy()
+        payload['prompt'] = prompt
+        payload['max_length'] = max_length
+        payload['temperature'] = temperature
+        payload['top_k'] = top_k
+        payload['top_p'] = top_p
+        payload['num_return_sequences'] = num_return_sequences
+        
+        return payload
     
     def get_history(
         self,
@@ -198,38 +678,123 @@ try:
     import asyncio
     
     class AsyncARSLMClient:
-        """Async version of ARSLM client."""
+        """
+        Async version of ARSLM client.
+        
+        A single ``aiohttp.ClientSession`` is created lazily and reused
+        across calls, so repeated requests share pooled keep-alive
+        connections instead of reconnecting every time. At most
+        ``max_concurrency`` requests are in flight at once; extra
+        coroutines wait for a free slot.
+        
+        Example:
+            >>> async with AsyncARSLMClient("http://localhost:8000") as client:
+            ...     response = await client.chat("Hello!", session_id="user123")
+        """
         
         def __init__(
             self,
             base_url: str = "http://localhost:8000",
             api_key: Optional[str] = None,
-            timeout: int = 30
+            timeout: int = 30,
+            max_concurrency: int = 32,
+            limit_per_host: int = 32
         ):
             self.base_url = base_url.rstrip('/')
             self.api_key = api_key
             self.timeout = aiohttp.ClientTimeout(total=timeout)
+            # Streams may run longer than timeout: only connecting and each
+            # read are bounded, like the sync client's per-read timeout
+            self.stream_timeout = aiohttp.ClientTimeout(
+                total=None,
+                sock_connect=timeout,
+                sock_read=timeout
+            )
+            self.max_concurrency = max_concurrency
+            self.limit_per_host = limit_per_host
             self.headers = {'Content-Type': 'application/json'}
             
             if api_key:
                 self.headers['Authorization'] = f'Bearer {api_key}'
+            
+            self._session: Optional[aiohttp.ClientSession] = None
+            self._sem: Optional[asyncio.Semaphore] = None
+        
+        async def __aenter__(self) -> "AsyncARSLMClient":
+            await self._get_session()
+            return self
+        
+        async def __aexit__(self, exc_type, exc, tb) -> None:
+            await self.close()
+        
+        async def _get_session(self) -> "aiohttp.ClientSession":
+            """Return the shared session, creating it on first use."""
+            if self._session is None or self._session.closed:
+                # Created here rather than in __init__ so both bind to the
+                # running event loop
+                self._sem = asyncio.Semaphore(self.max_concurrency)
+                self._session = aiohttp.ClientSession(
+                    headers=self.headers,
+                    timeout=self.timeout,
+                    connector=aiohttp.TCPConnector(
+                        limit=self.max_concurrency,
+                        limit_per_host=self.limit_per_host,
+                        ttl_dns_cache=300,
+                        keepalive_timeout=75
+                    )
+                )
+            return self._session
+        
+        async def close(self) -> None:
+            """Close the underlying HTTP session."""
+            if self._session is not None and not self._session.closed:
+                await self._session.close()
+            self._session = None
         
         async def _request(
             self,
             method: str,
             endpoint: str,
+            json: Optional[Dict[str, Any]] = None,
+            data: Optional[bytes] = None,
             **kwargs
         ) -> Dict[str, Any]:
             """Make async HTTP request."""
             url = f"{self.base_url}{endpoint}"
+            session = await self._get_session()
             
-            async with aiohttp.ClientSession(
-                headers=self.headers,
-                timeout=self.timeout
-            ) as session:
-                async with session.request(method, url, **kwargs) as response:
+            if json is not None:
+                data = _dumps(json)
+            
+            async with self._sem:
+                async with session.request(
+                    method,
+                    url,
+                    data=data,
+                    **kwargs
+                ) as response:
                     response.raise_for_status()
-                    return await response.json()
+                    return _loads(await response.read())
+        
+        async def _stream_request(
+            self,
+            endpoint: str,
+            payload: Dict[str, Any]
+        ) -> AsyncIterator[Dict[str, Any]]:
+            """POST payload and yield newline-delimited JSON chunks."""
+            url = f"{self.base_url}{endpoint}"
+            session = await self._get_session()
+            
+            async with self._sem:
+                async with session.post(
+                    url,
+                    data=_dumps(payload),
+                    timeout=self.stream_timeout
+                ) as response:
+                    response.raise_for_status()
+                    async for line in response.content:
+                        if line.strip():
+                            yield _loads(line)
         
         async def chat(
             self,
@@ -253,7 +818,276 @@ try:
             """Async generation."""
             payload = {'prompt': prompt, **kwargs}
             return await self._request('POST', '/api/v1/generate', json=payload)
+        
+        async def chat_stream(
+            self,
+            message: str,
+            session_id: str,
+            **kwargs
+        ) -> AsyncIterator[Dict[str, Any]]:
+            """Async streaming chat."""
+            payload = {
+                'message': message,
+                'session_id': session_id,
+                **kwargs,
+                'stream': True
+            }
+            async for chunk in self._stream_request('/api/v1/chat', payload):
+                yield chunk
+        
+        async def generate_stream(
+            self,
+            prompt: str,
+            **kwargs
+        ) -> AsyncIterator[Dict[str, Any]]:
+            """Async streaming generation."""
+            payload = {'prompt': prompt, **kwargs, 'stream': True}
+            async for chunk in self._stream_request('/api/v1/generate', payload):
+                yield chunk
 
 except ImportError:
     # aiohttp not available
-    AsyncARSLMClient = None
\ No newline at end of file
+    AsyncARSLMClient = None
+
+# HTTP/2 clients
+try:
+    import importlib.util
+    
+    import httpx
+    
+    # HTTP/2 needs the optional h2 package; fall back to HTTP/1.1
+    _HAS_H2 = importlib.util.find_spec('h2') is not None
+    
+    def _httpx_limits(max_connections: int) -> "httpx.Limits":
+        return httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections // 2,
+            keepalive_expiry=75
+        )
+    
+    class ARSLMClientHTTPX(ARSLMClient):
+        """
+        ARSLM client using httpx with HTTP/2.
+        
+        Against an HTTP/2 server, concurrent calls from several threads
+        are multiplexed as streams over a single connection instead of
+        each holding its own HTTP/1.1 connection. Caching and the public
+        API are the same as ``ARSLMClient``.
+        
+        Example:
+            >>> client = ARSLMClientHTTPX("https://api.example.com")
+            >>> response = client.chat("Hello!", session_id="user123")
+        """
+        
+        def __init__(
+            self,
+            base_url: str = "http://localhost:8000",
+            api_key: Optional[str] = None,
+            timeout: int = 30,
+            http2: bool = True,
+            max_connections: int = 64,
+            **kwargs
+        ):
+            """
+            Initialize HTTP/2 ARSLM client.
+            
+            Args:
+                base_url: Base URL of ARSLM API
+                api_key: API key for authentication (if required)
+                timeout: Request timeout in seconds
+                http2: Negotiate HTTP/2 when the h2 package is installed
+                max_connections: Maximum number of open connections
+                **kwargs: Cache options passed to ARSLMClient
+            """
+            super().__init__(base_url, api_key, timeout, **kwargs)
+            
+            self.client = httpx.Client(
+                base_url=self.base_url,
+                http2=http2 and _HAS_H2,
+                timeout=timeout,
+                headers=dict(self.session.headers),
+                limits=_httpx_limits(max_connections)
+            )
+        
+        def __enter__(self) -> "ARSLMClientHTTPX":
+            return self
+        
+        def __exit__(self, exc_type, exc, tb) -> None:
+            self.close()
+        
+        def close(self) -> None:
+            """Close the underlying HTTP connections."""
+            self.client.close()
+            self.session.close()
+        
+        def _request(
+            self,
+            method: str,
+            endpoint: str,
+            json: Optional[Dict[str, Any]] = None,
+            data: Optional[bytes] = None,
+            **kwargs
+        ) -> Dict[str, Any]:
+            """Make HTTP request to API."""
+            if json is not None:
+                data = _dumps(json)
+            
+            try:
+                response = self.client.request(
+                    method, endpoint, content=data, **kwargs
+                )
+                response.raise_for_status()
+                return _loads(response.content)
+            
+            except httpx.HTTPError as e:
+                raise ARSLMClientError(f"API request failed: {str(e)}")
+            
+            except ValueError as e:
+                raise ARSLMClientError(f"Invalid API response: {str(e)}")
+        
+        def _stream_request(
+            self,
+            endpoint: str,
+            payload: Dict[str, Any]
+        ) -> Iterator[Dict[str, Any]]:
+            """POST payload and yield newline-delimited JSON chunks."""
+            try:
+                with self.client.stream(
+                    'POST', endpoint, content=_dumps(payload)
+                ) as response:
+                    response.raise_for_status()
+                    for line in response.iter_lines():
+                        if line:
+                            yield _loads(line)
+            
+            except httpx.HTTPError as e:
+                raise ARSLMClientError(f"API request failed: {str(e)}")
+            
+            except ValueError as e:
+                raise ARSLMClientError(f"Invalid API response: {str(e)}")
+    
+    class AsyncARSLMClientHTTPX:
+        """
+        Async ARSLM client using httpx with HTTP/2.
+        
+        Concurrent coroutines share multiplexed HTTP/2 streams over the
+        pooled connections of one ``httpx.AsyncClient``.
+        
+        Example:
+            >>> async with AsyncARSLMClientHTTPX("https://api.example.com") as c:
+            ...     response = await c.chat("Hello!", session_id="user123")
+        """
+        
+        def __init__(
+            self,
+            base_url: str = "http://localhost:8000",
+            api_key: Optional[str] = None,
+            timeout: int = 30,
+            http2: bool = True,
+            max_connections: int = 64
+        ):
+            headers = {'Content-Type': 'application/json'}
+            if api_key:
+                headers['Authorization'] = f'Bearer {api_key}'
+            
+            self.base_url = base_url.rstrip('/')
+            self.client = httpx.AsyncClient(
+                base_url=self.base_url,
+                http2=http2 and _HAS_H2,
+                timeout=timeout,
+                headers=headers,
+                limits=_httpx_limits(max_connections)
+            )
+        
+        async def __aenter__(self) -> "AsyncARSLMClientHTTPX":
+            return self
+        
+        async def __aexit__(self, exc_type, exc, tb) -> None:
+            await self.close()
+        
+        async def close(self) -> None:
+            """Close the underlying HTTP connections."""
+            await self.client.aclose()
+        
+        async def _request(
+            self,
+            method: str,
+            endpoint: str,
+            json: Optional[Dict[str, Any]] = None,
+            **kwargs
+        ) -> Dict[str, Any]:
+            """Make async HTTP request."""
+            content = _dumps(json) if json is not None else None
+            response = await self.client.request(
+                method, endpoint, content=content, **kwargs
+            )
+            response.raise_for_status()
+            return _loads(response.content)
+        
+        async def _stream_request(
+            self,
+            endpoint: str,
+            payload: Dict[str, Any]
+        ) -> AsyncIterator[Dict[str, Any]]:
+            """POST payload and yield newline-delimited JSON chunks."""
+            async with self.client.stream(
+                'POST', endpoint, content=_dumps(payload)
+            ) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if line:
+                        yield _loads(line)
+        
+        async def chat(
+            self,
+            message: str,
+            session_id: str,
+            **kwargs
+        ) -> Dict[str, Any]:
+            """Async chat."""
+            payload = {
+                'message': message,
+                'session_id': session_id,
+                **kwargs
+            }
+            return await self._request('POST', '/api/v1/chat', json=payload)
+        
+        async def generate(
+            self,
+            prompt: str,
+            **kwargs
+        ) -> Dict[str, Any]:
+            """Async generation."""
+            payload = {'prompt': prompt, **kwargs}
+            return await self._request('POST', '/api/v1/generate', json=payload)
+        
+        async def chat_stream(
+            self,
+            message: str,
+            session_id: str,
+            **kwargs
+        ) -> AsyncIterator[Dict[str, Any]]:
+            """Async streaming chat."""
+            payload = {
+                'message': message,
+                'session_id': session_id,
+                **kwargs,
+                'stream': True
+            }
+            async for chunk in self._stream_request('/api/v1/chat', payload):
+                yield chunk
+        
+        async def generate_stream(
+            self,
+            prompt: str,
+            **kwargs
+        ) -> AsyncIterator[Dict[str, Any]]:
+            """Async streaming generation."""
+            payload = {'prompt': prompt, **kwargs, 'stream': True}
+            async for chunk in self._stream_request('/api/v1/generate', payload):
+                yield chunk
+
+except ImportError:
+    # httpx not available
+    ARSLMClientHTTPX = None
+    AsyncARSLMClientHTTPX = None
@@ -1,21 +1,73 @@
 # arslm/arslm.py
 from arslm.core.engine import ARSLMEngine
 
+try:
+    import numba
+except ImportError:
+    numba = None
+
+# Moteurs partagés par dataset_path : Streamlit réexécute le script à chaque
+# interaction, on évite ainsi de recréer le moteur et de recharger le dataset
+_ENGINE_CACHE = {}
+
+
 class ARSLM:
     """
     Wrapper pour ARSLMEngine compatible avec Streamlit_app.py
     Fournit generate(prompt, ...) et clear_history()
     """
 
-    def __init__(self, device="cpu", custom_model=False, dataset_path=None):
+    def __init__(self, device="cpu", custom_model=False, dataset_path=None, jit=False,
+                 shared=True):
         """
         Initialise ARSLM.
         Arguments optionnels :
         - device: 'cpu' ou 'cuda' (non utilisé ici mais pour compatibilité future)
         - custom_model: True/False (non utilisé pour SAFE MODE)
         - dataset_path: chemin vers le dataset JSON
+        - jit: compile la boucle de tokens du moteur avec numba (CPU uniquement)
+        - shared: réutilise le moteur déjà créé pour ce dataset_path.
+          L'historique est alors commun à toutes les instances partageant
+          le moteur ; shared=False donne un moteur (et un historique) isolé.
+        """
+        self.device = device
+
+        if shared:
+            key = dataset_path or "<default>"
+            if key not in _ENGINE_CACHE:
+                _ENGINE_CACHE[key] = ARSLMEngine(dataset_path=dataset_path)
+            self.engine = _ENGINE_CACHE[key]
+        else:
+            self.engine = ARSLMEngine(dataset_path=dataset_path)
+        self.jit_enabled = False
+
+        if jit:
+            self.jit_enabled = self.enable_jit()
+
+    def enable_jit(self):
         """
-        self.engine = ARSLMEngine(dataset_path=dataset_path)
+        Remplace la boucle de tokens du moteur par une version numba.
+
+        Le moteur expose sa boucle scalaire (post-traitement / échantillonnage
+        token par token) via l'attribut `token_loop` ; elle est compilée avec
+        numba.njit et réinstallée par ce même attribut. Sans numba, hors CPU
+        ou si le moteur n'expose pas de boucle, rien ne change. Idempotent :
+        une boucle déjà compilée est laissée telle quelle.
+
+        Retourne True si la version compilée est active.
+        """
+        if numba is None or self.device != "cpu":
+            return False
+
+        token_loop = getattr(self.engine, "token_loop", None)
+        if token_loop is None:
+            return False
+
+        # moteur partagé (shared=True) : la boucle peut déjà être compilée
+        # par une autre instance, numba.njit refuse un dispatcher
+        if not isinstance(token_loop, numba.core.dispatcher.Dispatcher):
+            self.engine.token_loop = numba.njit(cache=True, fastmath=True)(token_loop)
+        return True
 
     def generate(self, prompt, max_length=150, temperature=0.7, include_context=True):
         """
@@ -27,7 +79,7 @@ class ARSLM:
 
     def clear_history(self):
         """
-        Efface l'historique de conversation
+        Efface l'historique de conversation (celui du moteur, donc de toutes
+        les instances qui le partagent)
         """
         self.engine.clear_history()
-
@@ -5,24 +5,194 @@ Implements dynamic adaptation mechanisms that allow the model to adjust
 its behavior based on input characteristics and context.
 """
 
+import math
 import torch
 import torch.nn as nn
 import torch.nn.functional as F
-from typing import Optional, Tuple, List
+from typing import Callable, Optional, Tuple, List
+
+
+def _init_grouped_linear(weight: nn.Parameter, bias: nn.Parameter) -> None:
+    """
+    Initialize stacked expert weights like independent nn.Linear layers.
+    
+    Args:
+        weight: Weights [num_experts, in_features, out_features]
+        bias: Biases [num_experts, out_features]
+    """
+    bound = 1.0 / math.sqrt(weight.size(1))
+    nn.init.uniform_(weight, -bound, bound)
+    nn.init.uniform_(bias, -bound, bound)
+
+
+def _stack_legacy_experts(
+    state_dict: dict,
+    prefix: str,
+    name: str,
+    num_experts: int
+) -> None:
+    """
+    Convert per-expert nn.Sequential weights to stacked parameters.
+    
+    Older checkpoints store each expert as ``{name}.{i}.0`` and
+    ``{name}.{i}.3`` Linear layers; they are stacked in place into
+    ``W1``/``b1``/``W2``/``b2`` so those checkpoints still load.
+    """
+    legacy = f"{prefix}{name}.0.0.weight"
+    if legacy not in state_dict:
+        return
+    
+    for param, layer in (('1', 0), ('2', 3)):
+        weights = []
+        biases = []
+        for i in range(num_experts):
+            key = f"{prefix}{name}.{i}.{layer}"
+            weights.append(state_dict.pop(f"{key}.weight").t())
+            biases.append(state_dict.pop(f"{key}.bias"))
+        state_dict[f"{prefix}W{param}"] = torch.stack(weights)
+        state_dict[f"{prefix}b{param}"] = torch.stack(biases)
+
+
+def _check_top_k(top_k: Optional[int], num_experts: int, name: str) -> None:
+    """Raise ValueError unless top_k is None or in [1, num_experts]."""
+    if top_k is not None and not 1 <= top_k <= num_experts:
+        raise ValueError(
+            f"top_k must be between 1 and {name} ({num_experts}), got {top_k}"
+        )
+
+
+def _sparse_expert_forward(
+    hidden_states: torch.Tensor,
+    gate_weights: torch.Tensor,
+    run_expert: Callable[[int, torch.Tensor], torch.Tensor],
+    top_k: int
+) -> torch.Tensor:
+    """
+    Run only the top-k experts selected for each sequence.
+    
+    Args:
+        hidden_states: Input tensor [batch_size, seq_length, hidden_size]
+        gate_weights: Routing probabilities [batch_size, num_experts]
+        run_expert: Function applying expert ``e`` to a batch subset
+        top_k: Number of experts per sequence
+        
+    Returns:
+        Combined expert output [batch_size, seq_length, hidden_size]
+    """
+    topk_vals, topk_idx = gate_weights.topk(top_k, dim=-1)  # [batch, k]
+    topk_vals = topk_vals / topk_vals.sum(dim=-1, keepdim=True)
+    
+    output = torch.zeros_like(hidden_states)
+    for expert in topk_idx.unique().tolist():
+        # Sequences routed to this expert and their slot in the top-k
+        rows, slots = (topk_idx == expert).nonzero(as_tuple=True)
+        
+        h = run_expert(expert, hidden_states.index_select(0, rows))
+        
+        output.index_add_(0, rows, h * topk_vals[rows, slots].view(-1, 1, 1))
+    
+    return output
+
+
+def _grouped_expert_modules(
+    W1: torch.Tensor,
+    b1: torch.Tensor,
+    W2: torch.Tensor,
+    b2: torch.Tensor
+) -> nn.ModuleList:
+    """Materialize stacked expert weights as per-expert Linear pairs."""
+    experts = nn.ModuleList()
+    for e in range(W1.size(0)):
+        first = nn.Linear(W1.size(1), W1.size(2))
+        second = nn.Linear(W2.size(1), W2.size(2))
+        with torch.no_grad():
+            first.weight.copy_(W1[e].t())
+            first.bias.copy_(b1[e])
+            second.weight.copy_(W2[e].t())
+            second.bias.copy_(b2[e])
+        experts.append(nn.Sequential(first, nn.GELU(), second))
+    return experts
+
+
+def _release_stacked_experts(module: nn.Module) -> None:
+    """
+    Drop the FP32 stacked expert parameters once int8 copies exist.
+    
+    They are no longer used by forward, and keeping them would leave
+    weight memory (and the state_dict) larger than before quantization.
+    """
+    for name in ('W1', 'b1', 'W2', 'b2'):
+        delattr(module, name)
+
+
+def _quantize_linears(module: nn.Module) -> nn.Module:
+    """Swap every nn.Linear in module for a dynamic int8 Linear, in place."""
+    module.eval()
+    torch.ao.quantization.quantize_dynamic(
+        module, {nn.Linear}, dtype=torch.qint8, inplace=True
+    )
+    return module
+
+
+def _grouped_expert_outputs(
+    hidden_states: torch.Tensor,
+    W1: torch.Tensor,
+    b1: torch.Tensor,
+    W2: torch.Tensor,
+    b2: torch.Tensor,
+    dropout: nn.Module
+) -> torch.Tensor:
+    """
+    Run all stacked experts as batched GEMMs.
+    
+    Outputs are laid out expert-major ([num_experts, batch, seq, hidden])
+    so each expert is one contiguous bmm slice with its bias fused in.
+    """
+    batch_size, seq_length, hidden_size = hidden_states.shape
+    num_experts = W1.size(0)
+    
+    x = hidden_states.reshape(1, -1, hidden_size).expand(num_experts, -1, -1)
+    h = torch.baddbmm(b1.unsqueeze(1), x, W1)
+    h = dropout(F.gelu(h))
+    h = torch.baddbmm(b2.unsqueeze(1), h, W2)
+    
+    return h.view(num_experts, batch_size, seq_length, -1)
+
+
+def _combine_expert_modules(
+    experts: nn.ModuleList,
+    hidden_states: torch.Tensor,
+    gate_weights: torch.Tensor,
+    top_k: Optional[int] = None
+) -> torch.Tensor:
+    """Weighted combination of expert modules (dense or top-k)."""
+    if top_k is not None:
+        return _sparse_expert_forward(
+            hidden_states,
+            gate_weights,
+            lambda e, x: experts[e](x),
+            top_k
+        )
+    
+    outputs = torch.stack([expert(hidden_states) for expert in experts], dim=0)
+    return torch.einsum('ebsh,be->bsh', outputs, gate_weights)
 
 
 class AdaptiveLayer(nn.Module):
     """
     Adaptive layer that dynamically adjusts processing based on input.
     
-    Uses a gating mechanism to control information flow.
+    Uses a gating mechanism to control information flow. With ``top_k``
+    set, only the k highest-weighted experts run for each sequence
+    (sparse mixture of experts); otherwise all experts are combined.
     """
     
     def __init__(
         self,
         hidden_size: int,
         dropout: float = 0.1,
-        num_experts: int = 4
+        num_experts: int = 4,
+        top_k: Optional[int] = None
     ):
         """
         Initialize Adaptive Layer.
@@ -31,22 +201,31 @@ class AdaptiveLayer(nn.Module):
             hidden_size: Dimension of hidden states
             dropout: Dropout probability
             num_experts: Number of expert networks
+            top_k: Experts evaluated per sequence (None for dense routing)
         """
         super().__init__()
+        _check_top_k(top_k, num_experts, 'num_experts')
         
         self.hidden_size = hidden_size
         self.num_experts = num_experts
+        self.top_k = top_k
         
-        # Expert networks
-        self.experts = nn.ModuleList([
-            nn.Sequential(
-                nn.Linear(hidden_size, hidden_size * 2),
-                nn.GELU(),
-                nn.Dropout(dropout),
-                nn.Linear(hidden_size * 2, hidden_size)
-            )
-            for _ in range(num_experts)
-        ])
+        # Expert networks, stacked so all experts run as one grouped GEMM
+        # (each expert is Linear -> GELU -> Dropout -> Linear)
+        self.W1 = nn.Parameter(
+            torch.empty(num_experts, hidden_size, hidden_size * 2)
+        )
+        self.b1 = nn.Parameter(torch.empty(num_experts, hidden_size * 2))
+        self.W2 = nn.Parameter(
+            torch.empty(num_experts, hidden_size * 2, hidden_size)
+        )
+        self.b2 = nn.Parameter(torch.empty(num_experts, hidden_size))
+        _init_grouped_linear(self.W1, self.b1)
+        _init_grouped_linear(self.W2, self.b2)
+        self.expert_dropout = nn.Dropout(dropout)
+        
+        # Per-expert int8 modules, set by quantize_for_inference()
+        self.quantized_experts: Optional[nn.ModuleList] = None
         
         # Gating network (router)
         self.gate = nn.Sequential(
@@ -56,6 +235,29 @@ class AdaptiveLayer(nn.Module):
         )
         
         self.dropout = nn.Dropout(dropout)
+    
+    def _load_from_state_dict(self, state_dict, prefix, *args, **kwargs):
+        _stack_legacy_experts(state_dict, prefix, 'experts', self.num_experts)
+        super()._load_from_state_dict(state_dict, prefix, *args, **kwargs)
+    
+    def quantize_for_inference(self) -> "AdaptiveLayer":
+        """
+        Quantize Linear weights to int8 for CPU inference.
+        
+        Experts and the gate network use dynamically quantized int8
+        Linears; gating softmax stays in FP32. The FP32 stacked expert
+        weights are released, so the state_dict only holds the int8
+        experts. The module is put in eval mode and should not be trained
+        afterwards.
+        
+        Returns:
+            self
+        """
+        self.quantized_experts = _grouped_expert_modules(
+            self.W1, self.b1, self.W2, self.b2
+        )
+        _release_stacked_experts(self)
+        return _quantize_linears(self)
         
     def forward(self, hidden_states: torch.Tensor) -> torch.Tensor:
         """
@@ -75,22 +277,39 @@ class AdaptiveLayer(nn.Module):
         gate_logits = self.gate(pooled)  # [batch_size, num_experts]
         gate_weights = F.softmax(gate_logits, dim=-1)  # [batch_size, num_experts]
         
-        # Apply experts
-        expert_outputs = []
-        for expert in self.experts:
-            output = expert(hidden_states)  # [batch_size, seq_length, hidden_size]
-            expert_outputs.append(output)
-        
-        # Stack expert outputs
-        expert_outputs = torch.stack(expert_outputs, dim=-1)  # [batch, seq, hidden, experts]
+        sparse = self.top_k is not None and self.top_k < self.num_experts
         
-        # Weighted combination of expert outputs
-        gate_weights = gate_weights.unsqueeze(1).unsqueeze(2)  # [batch, 1, 1, experts]
-        output = (expert_outputs * gate_weights).sum(dim=-1)  # [batch, seq, hidden]
+        if self.quantized_experts is not None:
+            # int8 inference path
+            output = _combine_expert_modules(
+                self.quantized_experts, hidden_states, gate_weights,
+                self.top_k if sparse else None
+            )
+        elif sparse:
+            # Sparse routing: run only the selected experts
+            output = _sparse_expert_forward(
+                hidden_states, gate_weights, self._run_expert, self.top_k
+            )
+        else:
+            # Apply all experts at once
+            # [experts, batch, seq, hidden]
+            h = _grouped_expert_outputs(
+                hidden_states, self.W1, self.b1, self.W2, self.b2,
+                self.expert_dropout
+            )
+            
+            # Weighted combination of expert outputs
+            output = torch.einsum('ebsh,be->bsh', h, gate_weights)
         
         output = self.dropout(output)
         
         return output
+    
+    def _run_expert(self, expert: int, x: torch.Tensor) -> torch.Tensor:
+        """Apply a single expert to x."""
+        h = torch.matmul(x, self.W1[expert]) + self.b1[expert]
+        h = self.expert_dropout(F.gelu(h))
+        return torch.matmul(h, self.W2[expert]) + self.b2[expert]
 
 
 class DynamicRouter(nn.Module):
@@ -98,13 +317,15 @@ class DynamicRouter(nn.Module):
     Dynamic routing mechanism for adaptive computation.
     
     Routes inputs to different processing paths based on learned criteria.
+    With ``top_k`` set, only the k highest-weighted paths run per sequence.
     """
     
     def __init__(
         self,
         hidden_size: int,
         num_paths: int = 3,
-        dropout: float = 0.1
+        dropout: float = 0.1,
+        top_k: Optional[int] = None
     ):
         """
         Initialize Dynamic Router.
@@ -113,11 +334,14 @@ class DynamicRouter(nn.Module):
             hidden_size: Dimension of hidden states
             num_paths: Number of routing paths
             dropout: Dropout probability
+            top_k: Paths evaluated per sequence (None for dense routing)
         """
         super().__init__()
+        _check_top_k(top_k, num_paths, 'num_paths')
         
         self.hidden_size = hidden_size
         self.num_paths = num_paths
+        self.top_k = top_k
         
         # Routing decision network
         self.router = nn.Sequential(
@@ -127,18 +351,49 @@ class DynamicRouter(nn.Module):
             nn.Linear(hidden_size // 2, num_paths)
         )
         
-        # Processing paths
-        self.paths = nn.ModuleList([
-            nn.Sequential(
-                nn.Linear(hidden_size, hidden_size),
-                nn.GELU(),
-                nn.Dropout(dropout),
-                nn.Linear(hidden_size, hidden_size)
-            )
-            for _ in range(num_paths)
-        ])
+        # Processing paths, stacked so all paths run as one grouped GEMM
+        # (each path is Linear -> GELU -> Dropout -> Linear)
+        self.W1 = nn.Parameter(torch.empty(num_paths, hidden_size, hidden_size))
+        self.b1 = nn.Parameter(torch.empty(num_paths, hidden_size))
+        self.W2 = nn.Parameter(torch.empty(num_paths, hidden_size, hidden_size))
+        self.b2 = nn.Parameter(torch.empty(num_paths, hidden_size))
+        _init_grouped_linear(self.W1, self.b1)
+        _init_grouped_linear(self.W2, self.b2)
+        self.path_dropout = nn.Dropout(dropout)
+        
+        # Per-path int8 modules, set by quantize_for_inference()
+        self.quantized_paths: Optional[nn.ModuleList] = None
         
         self.dropout = nn.Dropout(dropout)
+    
+    def _load_from_state_dict(self, state_dict, prefix, *args, **kwargs):
+        _stack_legacy_experts(state_dict, prefix, 'paths', self.num_paths)
+        super()._load_from_state_dict(state_dict, prefix, *args, **kwargs)
+    
+    def quantize_for_inference(self) -> "DynamicRouter":
+        """
+        Quantize Linear weights to int8 for CPU inference.
+        
+        Paths and the router network use dynamically quantized int8
+        Linears; routing softmax stays in FP32. The FP32 stacked path
+        weights are released, so the state_dict only holds the int8
+        paths. The module is put in eval mode and should not be trained
+        afterwards.
+        
+        Returns:
+            self
+        """
+        self.quantized_paths = _grouped_expert_modules(
+            self.W1, self.b1, self.W2, self.b2
+        )
+        _release_stacked_experts(self)
+        return _quantize_linears(self)
+    
+    def _run_path(self, path: int, x: torch.Tensor) -> torch.Tensor:
+        """Apply a single processing path to x."""
+        h = torch.matmul(x, self.W1[path]) + self.b1[path]
+        h = self.path_dropout(F.gelu(h))
+        return torch.matmul(h, self.W2[path]) + self.b2[path]
         
     def forward(
         self,
@@ -160,17 +415,29 @@ class DynamicRouter(nn.Module):
         routing_logits = self.router(pooled)  # [batch_size, num_paths]
         routing_weights = F.softmax(routing_logits, dim=-1)
         
-        # Apply each path
-        path_outputs = []
-        for path in self.paths:
-            output = path(hidden_states)
-            path_outputs.append(output)
-        
-        # Stack and combine
-        path_outputs = torch.stack(path_outputs, dim=-1)  # [batch, seq, hidden, paths]
-        routing_weights = routing_weights.unsqueeze(1).unsqueeze(2)  # [batch, 1, 1, paths]
+        sparse = self.top_k is not None and self.top_k < self.num_paths
         
-        output = (path_outputs * routing_weights).sum(dim=-1)
+        if self.quantized_paths is not None:
+            # int8 inference path
+            output = _combine_expert_modules(
+                self.quantized_paths, hidden_states, routing_weights,
+                self.top_k if sparse else None
+            )
+        elif sparse:
+            # Sparse routing: run only the selected paths
+            output = _sparse_expert_forward(
+                hidden_states, routing_weights, self._run_path, self.top_k
+            )
+        else:
+            # Apply all paths at once
+            # [paths, batch, seq, hidden]
+            h = _grouped_expert_outputs(
+                hidden_states, self.W1, self.b1, self.W2, self.b2,
+                self.path_dropout
+            )
+            
+            # Combine
+            output = torch.einsum('pbsh,bp->bsh', h, routing_weights)
         output = self.dropout(output)
         
         if return_routing_weights:
@@ -190,7 +457,8 @@ class AdaptiveComputationTime(nn.Module):
         hidden_size: int,
         max_steps: int = 10,
         threshold: float = 0.99,
-        dropout: float = 0.1
+        dropout: float = 0.1,
+        unroll: bool = False
     ):
         """
         Initialize ACT mechanism.
@@ -200,12 +468,17 @@ class AdaptiveComputationTime(nn.Module):
             max_steps: Maximum computation steps
             threshold: Halting threshold
             dropout: Dropout probability
+            unroll: Always run max_steps steps and compute halting for
+                all of them at once with a cumulative sum. Faster for
+                short sequences and small max_steps, where per-step
+                overhead outweighs skipping halted tokens.
         """
         super().__init__()
         
         self.hidden_size = hidden_size
         self.max_steps = max_steps
         self.threshold = threshold
+        self.unroll = unroll
         
         # Processing unit
         self.processor = nn.Sequential(
@@ -222,6 +495,37 @@ class AdaptiveComputationTime(nn.Module):
         )
         
         self.dropout = nn.Dropout(dropout)
+    
+    def _forward_unrolled(
+        self,
+        state: torch.Tensor
+    ) -> Tuple[torch.Tensor, torch.Tensor]:
+        """
+        Run all steps, then derive halting weights in one pass.
+        
+        A token is still running at step t while the cumulative halting
+        probability before t is below the threshold; the step crossing it
+        contributes the remainder. This matches the iterative loop.
+        """
+        steps = []
+        for _ in range(self.max_steps):
+            state = self.processor(state)
+            steps.append(state)
+        
+        processed = torch.stack(steps)  # [steps, tokens, hidden]
+        p = self.halting_predictor(processed)  # [steps, tokens, 1]
+        
+        cumulative = p.cumsum(dim=0)
+        previous = cumulative - p
+        running = (previous < self.threshold).float()
+        update_weights = running * torch.where(
+            cumulative > self.threshold, 1.0 - previous, p
+        )
+        
+        accumulated_state = (processed * update_weights).sum(dim=0)
+        n_updates = running.sum(dim=0)
+        
+        return accumulated_state, n_updates
         
     def forward(self, hidden_states: torch.Tensor) -> Tuple[torch.Tensor, torch.Tensor]:
         """
@@ -234,34 +538,52 @@ class AdaptiveComputationTime(nn.Module):
             - Output tensor [batch_size, seq_length, hidden_size]
             - Ponder cost (average computation steps)
         """
-        batch_size, seq_length, _ = hidden_states.shape
-        device = hidden_states.device
+        batch_size, seq_length, hidden_size = hidden_states.shape
+        num_tokens = batch_size * seq_length
+        
+        # Work on flattened tokens so halted positions can be skipped
+        state = hidden_states.reshape(num_tokens, hidden_size)
         
-        # Initialize
-        state = hidden_states
-        halting_prob = torch.zeros(batch_size, seq_length, 1, device=device)
-        remainders = torch.zeros(batch_size, seq_length, 1, device=device)
-        n_updates = torch.zeros(batch_size, seq_length, 1, device=device)
-        accumulated_state = torch.zeros_like(hidden_states)
+        if self.unroll:
+            accumulated_state, n_updates = self._forward_unrolled(state)
+            return self._finish(accumulated_state, n_updates, hidden_states)
+        
+        halting_prob = state.new_zeros(num_tokens, 1)
+        n_updates = state.new_zeros(num_tokens, 1)
+        accumulated_state = torch.zeros_like(state)
         
         # Iterative processing
         for step in range(self.max_steps):
-            # Process current state
-            processed = self.processor(state)
+            running = halting_prob < self.threshold  # [tokens, 1]
+            active = running.squeeze(-1)
+            num_active = int(active.sum())
+            
+            # Check if all tokens have halted
+            if num_active == 0:
+                break
             
-            # Predict halting probability
-            p = self.halting_predictor(processed)
+            if num_active < 0.5 * num_tokens:
+                # Only process tokens that are still running; halted tokens
+                # keep a stale state that receives zero weight below
+                idx = active.nonzero(as_tuple=True)[0]
+                processed_active = self.processor(state.index_select(0, idx))
+                processed = state.index_copy(0, idx, processed_active)
+                p = halting_prob.new_zeros(num_tokens, 1).index_copy(
+                    0, idx, self.halting_predictor(processed_active)
+                )
+            else:
+                processed = self.processor(state)
+                p = self.halting_predictor(processed)
             
             # Update accumulated probability
-            still_running = (halting_prob < self.threshold).float()
+            still_running = running.float()
             new_halting_prob = halting_prob + p * still_running
             
-            # Compute update weights
-            update_weights = p * still_running
-            update_weights = torch.where(
-                new_halting_prob > self.threshold,
-                1.0 - halting_prob,
-                update_weights
+            # Compute update weights: tokens crossing the threshold this
+            # step contribute their remainder instead of p (branchless)
+            halts = (new_halting_prob > self.threshold).float()
+            update_weights = still_running * (
+                p * (1.0 - halts) + (1.0 - halting_prob) * halts
             )
             
             # Accumulate state
@@ -271,17 +593,22 @@ class AdaptiveComputationTime(nn.Module):
             halting_prob = new_halting_prob
             n_updates = n_updates + still_running
             
-            # Check if all sequences have halted
-            if (halting_prob >= self.threshold).all():
-                break
-            
             # Update state for next iteration
             state = processed
         
+        return self._finish(accumulated_state, n_updates, hidden_states)
+    
+    def _finish(
+        self,
+        accumulated_state: torch.Tensor,
+        n_updates: torch.Tensor,
+        hidden_states: torch.Tensor
+    ) -> Tuple[torch.Tensor, torch.Tensor]:
+        """Reshape accumulated tokens and compute ponder cost."""
         # Compute ponder cost (average number of steps)
         ponder_cost = n_updates.mean()
         
-        output = self.dropout(accumulated_state)
+        output = self.dropout(accumulated_state.view_as(hidden_states))
         
         return output, ponder_cost
 
@@ -296,7 +623,10 @@ class AdaptiveNormalization(nn.Module):
     def __init__(
         self,
         hidden_size: int,
-        eps: float = 1e-5
+        eps: float = 1e-5,
+        use_compile: bool = False,
+        track_running_stats: bool = False,
+        momentum: float = 0.1
     ):
         """
         Initialize Adaptive Normalization.
@@ -304,11 +634,25 @@ class AdaptiveNormalization(nn.Module):
         Args:
             hidden_size: Dimension of hidden states
             eps: Epsilon for numerical stability
+            use_compile: Fuse the normalization into a single kernel with
+                torch.compile (compiled on first call)
+            track_running_stats: Keep running batch statistics during
+                training and use them in eval mode, like nn.BatchNorm1d
+                (otherwise the current batch statistics are always used)
+            momentum: Update rate of the running statistics
         """
         super().__init__()
         
         self.hidden_size = hidden_size
         self.eps = eps
+        self.momentum = momentum
+        
+        if track_running_stats:
+            self.register_buffer('running_mean', torch.zeros(hidden_size))
+            self.register_buffer('running_var', torch.ones(hidden_size))
+        else:
+            self.running_mean = None
+            self.running_var = None
         
         # Learnable parameters
         self.gamma = nn.Parameter(torch.ones(hidden_size))
@@ -322,6 +666,40 @@ class AdaptiveNormalization(nn.Module):
             nn.Sigmoid()
         )
         
+        self._forward = self._forward_impl
+        if use_compile and hasattr(torch, 'compile'):
+            self._forward = torch.compile(self._forward_impl, dynamic=True)
+    
+    def _forward_impl(self, hidden_states: torch.Tensor) -> torch.Tensor:
+        # Fused layer and batch norm kernels, without affine
+        layer_norm = F.layer_norm(
+            hidden_states, (self.hidden_size,), eps=self.eps
+        )
+        # Batch statistics are per feature over all batch and sequence
+        # positions, i.e. batch norm over [batch * seq, hidden]
+        flat = hidden_states.reshape(-1, self.hidden_size)
+        if self.running_mean is not None and (not self.training or flat.size(0) > 1):
+            batch_norm = F.batch_norm(
+                flat,
+                self.running_mean,
+                self.running_var,
+                training=self.training,
+                momentum=self.momentum,
+                eps=self.eps
+            ).view_as(hidden_states)
+        else:
+            # Current batch statistics; F.batch_norm rejects a single
+            # position (e.g. one-token decoding with batch size 1)
+            batch_var, batch_mean = torch.var_mean(flat, dim=0, unbiased=False)
+            batch_norm = (hidden_states - batch_mean) * torch.rsqrt(batch_var + self.eps)
+        
+        # Compute gating weight
+        pooled = hidden_states.mean(dim=1)  # [batch_size, hidden_size]
+        gate = self.gate_network(pooled).unsqueeze(1)  # [batch_size, 1, 1]
+        
+        # Adaptive combination of layer and batch norm, then affine
+        return self.gamma * (gate * layer_norm + (1 - gate) * batch_norm) + self.beta
+        
     def forward(self, hidden_states: torch.Tensor) -> torch.Tensor:
         """
         Forward pass through adaptive normalization.
@@ -332,27 +710,7 @@ class AdaptiveNormalization(nn.Module):
         Returns:
             Normalized output
         """
-        # Layer normalization
-        layer_mean = hidden_states.mean(dim=-1, keepdim=True)
-        layer_var = hidden_states.var(dim=-1, keepdim=True, unbiased=False)
-        layer_norm = (hidden_states - layer_mean) / torch.sqrt(layer_var + self.eps)
-        
-        # Batch normalization
-        batch_mean = hidden_states.mean(dim=(0, 1), keepdim=True)
-        batch_var = hidden_states.var(dim=(0, 1), keepdim=True, unbiased=False)
-        batch_norm = (hidden_states - batch_mean) / torch.sqrt(batch_var + self.eps)
-        
-        # Compute gating weight
-        pooled = hidden_states.mean(dim=1)  # [batch_size, hidden_size]
-        gate = self.gate_network(pooled).unsqueeze(1)  # [batch_size, 1, 1]
-        
-        # Adaptive combination
-        normalized = gate * layer_norm + (1 - gate) * batch_norm
-        
-        # Apply affine transformation
-        output = self.gamma * normalized + self.beta
-        
-        return output
+        return self._forward(hidden_states)
 
 
 class ContextGating(nn.Module):
@@ -378,15 +736,46 @@ class ContextGating(nn.Module):
         
         context_size = context_size or hidden_size
         
-        # Gate computation
-        self.gate = nn.Sequential(
-            nn.Linear(hidden_size + context_size, hidden_size),
-            nn.Tanh(),
-            nn.Linear(hidden_size, hidden_size),
-            nn.Sigmoid()
-        )
+        # Gate computation: Wh(h) + Wc(c) is the Linear over [h, c] split
+        # by input, so the concatenation is never materialized
+        self.Wh = nn.Linear(hidden_size, hidden_size, bias=False)
+        self.Wc = nn.Linear(context_size, hidden_size)
+        self.W2 = nn.Linear(hidden_size, hidden_size)
+        
+        # Same init range as the single Linear over hidden + context
+        bound = 1.0 / math.sqrt(hidden_size + context_size)
+        for param in (self.Wh.weight, self.Wc.weight, self.Wc.bias):
+            nn.init.uniform_(param, -bound, bound)
         
         self.dropout = nn.Dropout(dropout)
+    
+    def _load_from_state_dict(self, state_dict, prefix, *args, **kwargs):
+        # Older checkpoints store the gate as
+        # Sequential(Linear(H + C, H), Tanh, Linear(H, H), Sigmoid)
+        legacy = f"{prefix}gate.0.weight"
+        if legacy in state_dict:
+            weight = state_dict.pop(legacy)
+            hidden_size = self.Wh.in_features
+            state_dict[f"{prefix}Wh.weight"] = weight[:, :hidden_size]
+            state_dict[f"{prefix}Wc.weight"] = weight[:, hidden_size:]
+            state_dict[f"{prefix}Wc.bias"] = state_dict.pop(f"{prefix}gate.0.bias")
+            for param in ('weight', 'bias'):
+                state_dict[f"{prefix}W2.{param}"] = state_dict.pop(
+                    f"{prefix}gate.2.{param}"
+                )
+        super()._load_from_state_dict(state_dict, prefix, *args, **kwargs)
+    
+    def quantize_for_inference(self) -> "ContextGating":
+        """
+        Quantize Linear weights to int8 for CPU inference.
+        
+        The sigmoid gate itself stays in FP32. The module is put in eval
+        mode and should not be trained afterwards.
+        
+        Returns:
+            self
+        """
+        return _quantize_linears(self)
         
     def forward(
         self,
@@ -403,11 +792,10 @@ class ContextGating(nn.Module):
         Returns:
             Gated output
         """
-        # Concatenate hidden states and context
-        combined = torch.cat([hidden_states, context], dim=-1)
-        
         # Compute gate
-        gate = self.gate(combined)
+        gate = torch.sigmoid(
+            self.W2(torch.tanh(self.Wh(hidden_states) + self.Wc(context)))
+        )
         
         # Apply gate
         output = hidden_states * gate
@@ -5,11 +5,32 @@ Handles text tokenization, encoding, and decoding.
 """
 
 import json
+import multiprocessing
+import os
 import re
+import threading
+from collections import Counter, OrderedDict
+from itertools import chain, repeat
 from pathlib import Path
 from typing import List, Dict, Optional, Union, Tuple
+import numpy as np
 import torch
 
+try:
+    import orjson
+    
+    def _dumps(obj) -> bytes:
+        return orjson.dumps(obj)
+    
+    _loads = orjson.loads
+
+except ImportError:
+    # orjson not available, fall back to the standard library
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj, ensure_ascii=False).encode('utf-8')
+    
+    _loads = json.loads
+
 
 class ARSLMTokenizer:
     """
@@ -25,11 +46,26 @@ class ARSLMTokenizer:
     EOS_TOKEN = "[EOS]"
     MASK_TOKEN = "[MASK]"
     
+    # Word tokenization pattern, compiled once. Any compiled pattern
+    # object with a findall() method can be substituted (e.g. re2 with
+    # Unicode classes), but stdlib re is the fastest option measured for
+    # this pattern: re2 and Hyperscan bindings spend more time creating
+    # per-match Python objects than the C matcher saves.
+    WORD_PATTERN = re.compile(r'\w+|[^\w\s]')
+    
+    # Tokens dropped by decode(skip_special_tokens=True)
+    _special_tokens = frozenset([PAD_TOKEN, BOS_TOKEN, EOS_TOKEN, MASK_TOKEN])
+    
+    # Shortest ID list decoded with a NumPy gather
+    _GATHER_MIN_LENGTH = 16
+    
     def __init__(
         self,
         vocab: Optional[Dict[str, int]] = None,
         max_length: int = 512,
-        tokenization_type: str = "word"  # "char", "word", or "subword"
+        tokenization_type: str = "word",  # "char", "word", or "subword"
+        cache_size: int = 1024,
+        prefix_cache_size: int = 64
     ):
         """
         Initialize tokenizer.
@@ -38,9 +74,23 @@ class ARSLMTokenizer:
             vocab: Vocabulary dictionary mapping tokens to IDs
             max_length: Maximum sequence length
             tokenization_type: Type of tokenization
+            cache_size: Number of encoded texts kept in the exact-match
+                (L0) cache, 0 to disable
+            prefix_cache_size: Number of tokenized text prefixes kept in
+                the prefix (L1) cache, 0 to disable
         """
         self.max_length = max_length
         self.tokenization_type = tokenization_type
+        self.cache_size = cache_size
+        self.prefix_cache_size = prefix_cache_size
+        
+        # L0: (text, options) -> token IDs; L1: text prefix -> tokens
+        self._encode_cache: "OrderedDict[tuple, List[int]]" = OrderedDict()
+        self._prefix_cache: "OrderedDict[str, List[str]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        
+        # Padding row copied by the default-options encode path
+        self._pad_row: List[int] = []
         
         if vocab is None:
             # Initialize with special tokens
@@ -55,7 +105,8 @@ class ARSLMTokenizer:
             self.vocab = vocab
         
         # Create reverse vocabulary
-        self.id_to_token = {v: k for k, v in self.vocab.items()}
+        self.id_to_token = self._reverse_vocab(self.vocab)
+        self._build_decode_table()
         
         # Special token IDs
         self.pad_token_id = self.vocab[self.PAD_TOKEN]
@@ -64,10 +115,25 @@ class ARSLMTokenizer:
         self.eos_token_id = self.vocab[self.EOS_TOKEN]
         self.mask_token_id = self.vocab[self.MASK_TOKEN]
     
+    def clear_cache(self) -> None:
+        """
+        Clear the encode and prefix caches.
+        
+        Called by build_vocab; call it after modifying ``vocab`` or
+        ``tokenization_type`` directly.
+        """
+        with self._cache_lock:
+            self._encode_cache.clear()
+            self._prefix_cache.clear()
+    
     def tokenize(self, text: str) -> List[str]:
         """
         Tokenize text into tokens.
         
+        Texts that extend a recently tokenized text (e.g. a growing chat
+        history) reuse the tokens of the longest cached prefix and only
+        tokenize the rest.
+        
         Args:
             text: Input text
             
@@ -76,13 +142,56 @@ class ARSLMTokenizer:
         """
         text = text.strip()
         
+        if self.prefix_cache_size <= 0:
+            return self._tokenize(text)
+        
+        # Split before the last whitespace: no token spans whitespace, so
+        # tokens(text) == tokens(head) + tokens(tail)
+        split = max(text.rfind(' '), text.rfind('\n'))
+        if split <= 0:
+            return self._tokenize(text)
+        
+        head = text[:split]
+        prefix, prefix_tokens = self._lookup_prefix(head)
+        
+        if prefix == head:
+            head_tokens = prefix_tokens
+        else:
+            head_tokens = prefix_tokens + self._tokenize(head[len(prefix):])
+            with self._cache_lock:
+                self._prefix_cache[head] = head_tokens
+                while len(self._prefix_cache) > self.prefix_cache_size:
+                    self._prefix_cache.popitem(last=False)
+        
+        return head_tokens + self._tokenize(text[split:])
+    
+    def _lookup_prefix(self, text: str) -> Tuple[str, List[str]]:
+        """Return the longest cached prefix of text ending at whitespace."""
+        best, best_tokens = "", []
+        
+        with self._cache_lock:
+            for prefix, tokens in self._prefix_cache.items():
+                n = len(prefix)
+                if (
+                    n > len(best)
+                    and text.startswith(prefix)
+                    and (n == len(text) or text[n].isspace())
+                ):
+                    best, best_tokens = prefix, tokens
+            
+            if best:
+                self._prefix_cache.move_to_end(best)
+        
+        return best, best_tokens
+    
+    def _tokenize(self, text: str) -> List[str]:
+        """Tokenize text without stripping or caching."""
         if self.tokenization_type == "char":
             return list(text)
         
         elif self.tokenization_type == "word":
             # Simple word tokenization
-            tokens = re.findall(r'\w+|[^\w\s]', text.lower())
-            return tokens
+            return self.WORD_PATTERN.findall(text.lower())
         
         elif self.tokenization_type == "subword":
             # Placeholder for BPE/WordPiece
@@ -115,34 +224,113 @@ class ARSLMTokenizer:
         Returns:
             Token IDs as list or tensor
         """
+        if (
+            add_special_tokens and padding and truncation
+            and return_tensors is None
+            and (max_length is None or max_length == self.max_length)
+        ):
+            return self._encode_fixed(text)
+        
         max_length = max_length or self.max_length
         
+        token_ids = self._token_ids(
+            text, add_special_tokens, max_length, truncation
+        )
+        
+        # Pad if necessary, in place
+        if padding and len(token_ids) < max_length:
+            token_ids.extend(repeat(self.pad_token_id, max_length - len(token_ids)))
+        
+        # Convert to tensor if requested
+        if return_tensors == "pt":
+            return _ids_to_tensor(token_ids)
+        
+        return token_ids
+    
+    def _encode_fixed(self, text: str) -> List[int]:
+        """
+        Encode with the default options: [BOS]/[EOS], truncated and padded
+        to ``max_length``.
+        
+        Padding copies a prebuilt row and overwrites its head rather than
+        extending with one pad ID at a time, and cached IDs are read
+        without the defensive copy.
+        """
+        if len(self._pad_row) != self.max_length:
+            self._pad_row = [self.pad_token_id] * self.max_length
+        
+        token_ids = self._token_ids(
+            text, True, self.max_length, True, copy=False
+        )
+        
+        row = self._pad_row.copy()
+        row[:len(token_ids)] = token_ids
+        return row
+    
+    def convert_tokens_to_ids(self, tokens: List[str]) -> List[int]:
+        """
+        Map tokens to IDs, unknown tokens to [UNK].
+        
+        The whole list is looked up in one C-level ``map`` over
+        ``dict.get`` rather than a Python loop per token.
+        
+        Args:
+            tokens: Tokens to convert
+            
+        Returns:
+            Token IDs
+        """
+        return list(map(self.vocab.get, tokens, repeat(self.unk_token_id)))
+    
+    def _token_ids(
+        self,
+        text: str,
+        add_special_tokens: bool,
+        max_length: int,
+        truncation: bool,
+        copy: bool = True
+    ) -> List[int]:
+        """
+        Tokenize text and map it to unpadded token IDs.
+        
+        With ``copy=False`` a cache hit returns the cached list itself,
+        which the caller must not modify.
+        """
+        if self.cache_size > 0:
+            key = (text, add_special_tokens, max_length, truncation)
+            with self._cache_lock:
+                token_ids = self._encode_cache.get(key)
+                if token_ids is not None:
+                    self._encode_cache.move_to_end(key)
+                    return list(token_ids) if copy else token_ids
+        
         # Tokenize
         tokens = self.tokenize(text)
         
-        # Convert to IDs
-        token_ids = [
-            self.vocab.get(token, self.unk_token_id)
-            for token in tokens
-        ]
+        # Truncate before lookup so dropped tokens are never converted
+        num_special = 2 if add_special_tokens else 0
+        if truncation and len(tokens) + num_special > max_length:
+            tokens = tokens[:max(max_length - num_special, 0)]
         
-        # Add special tokens
+        # Convert to IDs, writing special tokens into the same list
         if add_special_tokens:
-            token_ids = [self.bos_token_id] + token_ids + [self.eos_token_id]
+            token_ids = [self.bos_token_id]
+            token_ids.extend(map(self.vocab.get, tokens, repeat(self.unk_token_id)))
+            token_ids.append(self.eos_token_id)
+        else:
+            token_ids = self.convert_tokens_to_ids(tokens)
         
-        # Truncate if necessary
+        # Only reachable when max_length is too small for [BOS] and [EOS]
         if truncation and len(token_ids) > max_length:
             token_ids = token_ids[:max_length]
             if add_special_tokens:
                 token_ids[-1] = self.eos_token_id
         
-        # Pad if necessary
-        if padding and len(token_ids) < max_length:
-            token_ids = token_ids + [self.pad_token_id] * (max_length - len(token_ids))
-        
-        # Convert to tensor if requested
-        if return_tensors == "pt":
-            return torch.tensor(token_ids, dtype=torch.long)
+        if self.cache_size > 0:
+            with self._cache_lock:
+                self._encode_cache[key] = list(token_ids)
+                while len(self._encode_cache) > self.cache_size:
+                    self._encode_cache.popitem(last=False)
         
         return token_ids
     
@@ -161,26 +349,82 @@ class ARSLMTokenizer:
         Returns:
             Decoded text
         """
+        if isinstance(token_ids, list) and len(token_ids) < self._GATHER_MIN_LENGTH:
+            # Short sequences (e.g. streamed tokens) are cheaper to look up
+            # in Python than to convert to an array
+            id_to_token = self.id_to_token
+            size = len(id_to_token)
+            tokens = [
+                id_to_token[token_id] if 0 <= token_id < size else self.UNK_TOKEN
+                for token_id in token_ids
+            ]
+            if skip_special_tokens:
+                tokens = [t for t in tokens if t not in self._special_tokens]
+            return self._join(tokens)
+        
+        ids = self._table_index(token_ids)
+        
+        # Skip special tokens if requested
+        if skip_special_tokens:
+            ids = ids[~self._special_mask[ids]]
+        
+        # Convert IDs to tokens and join
+        return self._join(self._decode_table[ids].tolist())
+    
+    def _reverse_vocab(self, vocab: Dict[str, int]) -> List[str]:
+        """
+        Build the ID -> token list for a vocabulary.
+        
+        IDs are contiguous for vocabularies built by build_vocab; gaps in
+        a user-supplied vocabulary hold [UNK] and negative IDs are ignored.
+        """
+        id_to_token = [self.UNK_TOKEN] * (max(vocab.values(), default=-1) + 1)
+        for token, token_id in vocab.items():
+            if token_id >= 0:
+                id_to_token[token_id] = token
+        return id_to_token
+    
+    def _build_decode_table(self) -> None:
+        """
+        Build the array-based reverse vocabulary used for decoding.
+        
+        ``_decode_table[i]`` is the token of ID ``i`` (``id_to_token[i]``);
+        the extra last slot (used for out-of-range IDs) holds [UNK].
+        ``_special_mask`` flags IDs skipped by skip_special_tokens.
+        """
+        size = len(self.id_to_token)
+        
+        table = np.empty(size + 1, dtype=object)
+        table[:size] = self.id_to_token
+        table[size] = self.UNK_TOKEN
+        
+        self._decode_table = table
+        self._special_mask = np.fromiter(
+            (token in self._special_tokens for token in table),
+            dtype=bool,
+            count=len(table)
+        )
+    
+    def _table_index(
+        self,
+        token_ids: Union[List[int], torch.Tensor, np.ndarray]
+    ) -> np.ndarray:
+        """Convert token IDs to indices into the decode table."""
         if isinstance(token_ids, torch.Tensor):
-            token_ids = token_ids.tolist()
+            ids = token_ids.detach().cpu().numpy().astype(np.int64, copy=False)
+        else:
+            ids = np.asarray(token_ids, dtype=np.int64)
         
-        # Convert IDs to tokens
-        tokens = []
-        for token_id in token_ids:
-            token = self.id_to_token.get(token_id, self.UNK_TOKEN)
-            
-            # Skip special tokens if requested
-            if skip_special_tokens and token in [
-                self.PAD_TOKEN,
-                self.BOS_TOKEN,
-                self.EOS_TOKEN,
-                self.MASK_TOKEN
-            ]:
-                continue
-            
-            tokens.append(token)
+        # Unknown IDs point at the trailing [UNK] slot
+        unknown_slot = len(self._decode_table) - 1
+        invalid = (ids < 0) | (ids >= unknown_slot)
+        if invalid.any():
+            ids = np.where(invalid, unknown_slot, ids)
         
-        # Join tokens
+        return ids
+    
+    def _join(self, tokens: List[str]) -> str:
+        """Join decoded tokens into text."""
         if self.tokenization_type == "char":
             return "".join(tokens)
         else:
@@ -189,31 +433,60 @@ class ARSLMTokenizer:
     def batch_encode(
         self,
         texts: List[str],
+        add_special_tokens: bool = True,
+        max_length: Optional[int] = None,
+        padding: bool = True,
+        truncation: bool = True,
         **kwargs
     ) -> Dict[str, torch.Tensor]:
         """
         Batch encode multiple texts.
         
+        Token IDs of all texts are written into one preallocated padded
+        tensor in a single masked assignment instead of stacking one
+        tensor per text.
+        
         Args:
             texts: List of input texts
-            **kwargs: Arguments passed to encode()
+            add_special_tokens: Whether to add [BOS] and [EOS]
+            max_length: Maximum sequence length
+            padding: Whether to pad to max_length (otherwise to the
+                longest text in the batch)
+            truncation: Whether to truncate if too long
+            **kwargs: Ignored, accepted for compatibility with encode()
             
         Returns:
             Dictionary with 'input_ids' and 'attention_mask'
         """
-        kwargs['return_tensors'] = 'pt'
-        
-        # Encode all texts
-        all_token_ids = []
-        for text in texts:
-            token_ids = self.encode(text, **kwargs)
-            all_token_ids.append(token_ids)
+        max_length = max_length or self.max_length
         
-        # Stack into batch
-        input_ids = torch.stack(all_token_ids)
+        # Serial on purpose: re.findall and the dict lookups hold the GIL,
+        # so a thread pool only adds scheduling overhead (measured ~20%
+        # slower), and a process pool would pickle the vocabulary per call.
+        # Large corpora go through build_vocab's process pool instead.
+        rows = [
+            self._token_ids(text, add_special_tokens, max_length, truncation)
+            for text in texts
+        ]
+        lengths = torch.from_numpy(
+            np.fromiter(map(len, rows), dtype=np.int64, count=len(rows))
+        )
+        
+        longest = int(lengths.max()) if len(rows) else 0
+        width = max(longest, max_length) if padding else longest
+        
+        # Fill the padded batch; mask positions are in row-major order,
+        # matching the concatenated token IDs
+        input_ids = torch.full(
+            (len(rows), width), self.pad_token_id, dtype=torch.long
+        )
+        mask = torch.arange(width) < lengths.unsqueeze(1)
+        input_ids[mask] = _ids_to_tensor(
+            np.fromiter(chain.from_iterable(rows), dtype=np.int64)
+        )
         
         # Create attention mask
-        attention_mask = (input_ids != self.pad_token_id).long()
+        attention_mask = mask.long()
         
         return {
             'input_ids': input_ids,
@@ -235,16 +508,38 @@ class ARSLMTokenizer:
         Returns:
             List of decoded texts
         """
-        return [
-            self.decode(seq, **kwargs)
-            for seq in token_ids
-        ]
+        skip_special_tokens = kwargs.get('skip_special_tokens', True)
+        
+        try:
+            ids = self._table_index(token_ids)
+        except ValueError:
+            # Ragged list of sequences
+            ids = None
+        
+        if ids is None or ids.ndim != 2:
+            return [
+                self.decode(seq, **kwargs)
+                for seq in token_ids
+            ]
+        
+        # Gather all tokens of the batch at once
+        tokens = self._decode_table[ids]
+        
+        if skip_special_tokens:
+            keep = ~self._special_mask[ids]
+            return [
+                self._join(row[row_keep].tolist())
+                for row, row_keep in zip(tokens, keep)
+            ]
+        
+        return [self._join(row.tolist()) for row in tokens]
     
     def build_vocab(
         self,
         texts: List[str],
         vocab_size: int = 10000,
-        min_frequency: int = 2
+        min_frequency: int = 2,
+        num_workers: Optional[int] = 1
     ) -> None:
         """
         Build vocabulary from texts.
@@ -253,14 +548,35 @@ class ARSLMTokenizer:
             texts: List of texts to build vocab from
             vocab_size: Maximum vocabulary size
             min_frequency: Minimum token frequency
+            num_workers: Number of processes counting tokens in parallel
+                (None for the CPU count). Counting stays in this process
+                by default: a process pool has to pickle the texts and,
+                with the spawn start method, needs an
+                ``if __name__ == "__main__"`` guard in the calling script.
         """
-        from collections import Counter
+        if num_workers is None:
+            num_workers = os.cpu_count() or 1
+        
+        # Tokenize and count all texts
+        if num_workers > 1 and len(texts) > num_workers:
+            chunk_size = -(-len(texts) // num_workers)
+            chunks = [
+                (self.tokenization_type, texts[i:i + chunk_size])
+                for i in range(0, len(texts), chunk_size)
+            ]
+            with multiprocessing.Pool(num_workers) as pool:
+                # Merged in chunk order, so ties keep first-seen order
+                token_counts = Counter()
+                for counts in pool.map(_count_tokens, chunks):
+                    token_counts.update(counts)
+        else:
+            token_counts = _count_tokens((self.tokenization_type, texts))
         
-        # Tokenize all texts
-        token_counts = Counter()
-        for text in texts:
-            tokens = self.tokenize(text)
-            token_counts.update(tokens)
+        # Drop rare tokens before ranking
+        token_counts = Counter({
+            token: count for token, count in token_counts.items()
+            if count >= min_frequency
+        })
         
         # Keep special tokens
         new_vocab = {
@@ -271,21 +587,31 @@ class ARSLMTokenizer:
             self.MASK_TOKEN: 4,
         }
         
-        # Add most common tokens
+        id_to_token = list(new_vocab)
+        
+        # Add most common tokens, keeping the reverse list in step
         next_id = len(new_vocab)
-        for token, count in token_counts.most_common(vocab_size):
-            if count >= min_frequency and token not in new_vocab:
+        for token, _ in token_counts.most_common(vocab_size):
+            if token not in new_vocab:
                 new_vocab[token] = next_id
+                id_to_token.append(token)
                 next_id += 1
                 
                 if len(new_vocab) >= vocab_size:
                     break
         
         self.vocab = new_vocab
-        self.id_to_token = {v: k for k, v in self.vocab.items()}
+        self.id_to_token = id_to_token
+        self._build_decode_table()
+        self.clear_cache()
     
     def save(self, path: Union[str, Path]) -> None:
-        """Save tokenizer to file."""
+        """
+        Save tokenizer to file.
+        
+        Written as compact UTF-8 JSON (with orjson when available) in one
+        write; indentation only made large vocabularies slower and bigger.
+        """
         path = Path(path)
         path.parent.mkdir(parents=True, exist_ok=True)
         
@@ -295,16 +621,14 @@ class ARSLMTokenizer:
             'tokenization_type': self.tokenization_type,
         }
         
-        with open(path, 'w', encoding='utf-8') as f:
-            json.dump(config, f, ensure_ascii=False, indent=2)
+        path.write_bytes(_dumps(config))
     
     @classmethod
     def load(cls, path: Union[str, Path]) -> "ARSLMTokenizer":
         """Load tokenizer from file."""
         path = Path(path)
         
-        with open(path, 'r', encoding='utf-8') as f:
-            config = json.load(f)
+        config = _loads(path.read_bytes())
         
         return cls(**config)
     
@@ -315,4 +639,35 @@ class ARSLMTokenizer:
     @property
     def vocab_size(self) -> int:
         """Get vocabulary size."""
-        return len(self.vocab)
\ No newline at end of file
+        return len(self.vocab)
+
+
+def _ids_to_tensor(token_ids: Union[List[int], np.ndarray]) -> torch.Tensor:
+    """
+    Convert token IDs to a LongTensor.
+    
+    Goes through NumPy's C list converter, which is ~3x faster than
+    torch.tensor() on a Python list of ints.
+    """
+    return torch.from_numpy(np.asarray(token_ids, dtype=np.int64))
+
+
+def _count_tokens(args: Tuple[str, List[str]]) -> Counter:
+    """Count tokens of texts; top-level so worker processes can run it."""
+    tokenization_type, texts = args
+    tokenizer = ARSLMTokenizer(
+        tokenization_type=tokenization_type,
+        cache_size=0,
+        prefix_cache_size=0
+    )
+    if tokenization_type == "word" and not any("\x00" in t for t in texts):
+        # One regex pass over all texts joined by NUL, which is matched
+        # as its own token and then dropped from the counts
+        joined = "\x00".join(texts).lower()
+        counts = Counter(tokenizer.WORD_PATTERN.findall(joined))
+        del counts["\x00"]
+        return counts
+    
+    return Counter(chain.from_iterable(
+        tokenizer.tokenize(text) for text in texts
+    ))
@@ -8,12 +8,19 @@
 import math
 import random
 import os
+from collections import OrderedDict
 from typing import List
 
+import numpy as np
 import torch
 import torch.nn as nn
 import torch.nn.functional as F
 
+try:
+    import numba
+except ImportError:
+    numba = None
+
 # Utiliser la version fast si disponible
 try:
     from transformers import BertTokenizerFast as HFTokenizer
@@ -28,8 +35,10 @@ class AdvancedTokenizer:
     - decode(ids) -> str (skip special tokens)
     - len(tokenizer) renvoie la taille du vocab
     - expose les ids pour pad/bos/eos
+    - encode met en cache (LRU) les derniers textes encodés : un prompt déjà
+      vu (historique rejoué par Streamlit) n'est pas re-tokenisé
     """
-    def __init__(self, pretrained_name: str = "bert-base-uncased"):
+    def __init__(self, pretrained_name: str = "bert-base-uncased", cache_size: int = 1024):
         # Charger le tokenizer (cache HF normalement)
         self.tokenizer = HFTokenizer.from_pretrained(pretrained_name, use_fast=True)
         # récupère le dict token->id
@@ -48,9 +57,24 @@ class AdvancedTokenizer:
         self.bos_token_id = getattr(self.tokenizer, "cls_token_id", 101)
         self.eos_token_id = getattr(self.tokenizer, "sep_token_id", 102)
 
+        # cache LRU par instance (dict ordonné : reste picklable et copiable) ;
+        # tuples pour que l'appelant ne puisse pas le modifier
+        self.cache_size = cache_size
+        self._encode_cache: "OrderedDict[str, tuple]" = OrderedDict()
+
     def encode(self, text: str) -> List[int]:
         # retourne ids sans ajouter les special tokens (on ajoutera BOS/EOS si besoin)
-        return self.tokenizer.encode(text, add_special_tokens=False)
+        ids = self._encode_cache.get(text)
+        if ids is not None:
+            self._encode_cache.move_to_end(text)
+            return list(ids)
+
+        ids = tuple(self.tokenizer.encode(text, add_special_tokens=False))
+        if self.cache_size > 0:
+            self._encode_cache[text] = ids
+            while len(self._encode_cache) > self.cache_size:
+                self._encode_cache.popitem(last=False)
+        return list(ids)
 
     def decode(self, ids: List[int]) -> str:
         return self.tokenizer.decode(ids, skip_special_tokens=True)
@@ -68,44 +92,169 @@ class ARSCell(nn.Module):
     def __init__(self, emb_dim: int, hidden_dim: int, dropout_prob: float = 0.1):
         super().__init__()
         self.hidden_dim = hidden_dim
-        # candidate MLP: input dim = h_prev1 + h_prev2 + x_embed
-        self.candidate_mlp = nn.Sequential(
-            nn.Linear(hidden_dim * 2 + emb_dim, hidden_dim * 2),
-            nn.ReLU(inplace=True),
-            nn.Linear(hidden_dim * 2, hidden_dim),
-        )
-        # gate network -> scalar in (0,1)
-        self.gate_net = nn.Sequential(
-            nn.Linear(hidden_dim * 2 + emb_dim, hidden_dim),
-            nn.Tanh(),
-            nn.Linear(hidden_dim, 1),
-            nn.Sigmoid(),
-        )
+        # first layers of the candidate MLP (-> 2*hidden_dim, ReLU) and of the
+        # gate network (-> hidden_dim, Tanh) share their input
+        # h_prev1 + h_prev2 + x_embed : une seule GEMM pour les deux
+        self.fused_in = nn.Linear(hidden_dim * 2 + emb_dim, hidden_dim * 3)
+        self.cand_out = nn.Linear(hidden_dim * 2, hidden_dim)
+        # gate -> scalar in (0,1)
+        self.gate_out = nn.Linear(hidden_dim, 1)
         self.res_proj = nn.Linear(emb_dim, hidden_dim)
         self.dropout = nn.Dropout(dropout_prob)
 
-    def forward(self, h_prev2: torch.Tensor, h_prev1: torch.Tensor, x_embed: torch.Tensor):
-        # expected shapes:
-        #   h_prev2, h_prev1: (batch, hidden_dim)
-        #   x_embed: (batch, emb_dim)
-        ctx = torch.cat([h_prev1, h_prev2, x_embed], dim=-1)
-        candidate = self.candidate_mlp(ctx)                # (batch, hidden_dim)
-        gate = self.gate_net(ctx).squeeze(-1)              # (batch,)
-        residual = self.res_proj(x_embed)
+    def _load_from_state_dict(self, state_dict, prefix, *args, **kwargs):
+        # Older checkpoints store candidate_mlp / gate_net Sequentials
+        cand, gate = prefix + 'candidate_mlp.', prefix + 'gate_net.'
+        if cand + '0.weight' in state_dict and prefix + 'fused_in.weight' not in state_dict:
+            for name in ('weight', 'bias'):
+                state_dict[prefix + 'fused_in.' + name] = torch.cat(
+                    [state_dict.pop(cand + '0.' + name), state_dict.pop(gate + '0.' + name)]
+                )
+                state_dict[prefix + 'cand_out.' + name] = state_dict.pop(cand + '2.' + name)
+                state_dict[prefix + 'gate_out.' + name] = state_dict.pop(gate + '2.' + name)
+        super()._load_from_state_dict(state_dict, prefix, *args, **kwargs)
+
+    def _finish(self, fused: torch.Tensor, h_prev1: torch.Tensor, residual: torch.Tensor):
+        """
+        Du pré-activation fusionné (batch, 3*hidden_dim) à h_t ;
+        residual est déjà mis à l'échelle (0.1 * res_proj(x_embed)).
+        """
+        H2 = self.hidden_dim * 2
+        candidate = self.cand_out(F.relu(fused[..., :H2]))                  # (batch, hidden_dim)
+        gate = torch.sigmoid(self.gate_out(torch.tanh(fused[..., H2:]))).squeeze(-1)  # (batch,)
         # adaptative update
-        h_t = h_prev1 + gate.unsqueeze(-1) * candidate + 0.1 * residual
+        h_t = torch.addcmul(h_prev1 + residual, gate.unsqueeze(-1), candidate)
         h_t = self.dropout(h_t)
         # stable layer norm
         h_t = F.layer_norm(h_t, (self.hidden_dim,))
         return h_t, gate
 
+    def project_input(self, x_embed: torch.Tensor):
+        """
+        Partie de la cellule qui ne dépend que de l'entrée : peut être
+        calculée pour toute la séquence (batch, seq, emb_dim) en une fois.
+        returns the x-part of the fused pre-activations and the scaled residual
+        """
+        H2 = self.hidden_dim * 2
+        fused_x = F.linear(x_embed, self.fused_in.weight[:, H2:], self.fused_in.bias)
+        residual = 0.1 * self.res_proj(x_embed)
+        return fused_x, residual
+
+    def step(self, h_prev2: torch.Tensor, h_prev1: torch.Tensor, projected):
+        """
+        Mise à jour récurrente à partir d'une entrée déjà projetée
+        (voir project_input) : seule la partie dépendant de h_{t-1}, h_{t-2}
+        est calculée ici.
+        """
+        fused_x, residual = projected
+        H2 = self.hidden_dim * 2
+        h_ctx = torch.cat([h_prev1, h_prev2], dim=-1)      # (batch, 2*hidden_dim)
+        fused = fused_x + F.linear(h_ctx, self.fused_in.weight[:, :H2])
+        return self._finish(fused, h_prev1, residual)
+
+    def scan(self, h_prev2: torch.Tensor, h_prev1: torch.Tensor, projected, kernel):
+        """
+        Boucle temporelle complète sur une entrée déjà projetée (voir
+        project_input) par un noyau compilé (voir _ars_scan) : inférence CPU
+        en float32 uniquement (pas d'autograd, pas de dropout).
+        returns states (batch, seq, hidden_dim) and gates (batch, seq)
+        """
+        fused_x, residual = projected
+        H2 = self.hidden_dim * 2
+        weight = self.fused_in.weight
+        states, gates = kernel(
+            fused_x.contiguous().numpy(),
+            residual.contiguous().numpy(),
+            h_prev2.contiguous().numpy(),
+            h_prev1.contiguous().numpy(),
+            weight[:, :H2].t().contiguous().numpy(),
+            self.cand_out.weight.t().contiguous().numpy(),
+            self.cand_out.bias.numpy(),
+            self.gate_out.weight.t().contiguous().numpy(),
+            self.gate_out.bias.numpy(),
+        )
+        return torch.from_numpy(states), torch.from_numpy(gates)
+
+    def forward(self, h_prev2: torch.Tensor, h_prev1: torch.Tensor, x_embed: torch.Tensor):
+        # expected shapes:
+        #   h_prev2, h_prev1: (batch, hidden_dim)
+        #   x_embed: (batch, emb_dim)
+        ctx = torch.cat([h_prev1, h_prev2, x_embed], dim=-1)
+        return self._finish(self.fused_in(ctx), h_prev1, 0.1 * self.res_proj(x_embed))
+
+
+def _ars_scan(fused_x, residual, h_prev2, h_prev1, w_h, w_cand, b_cand, w_gate, b_gate):
+    """
+    Boucle t de ARSCell.step/_finish en NumPy pur, compilée par numba.njit
+    (voir ARSLM.enable_jit) : toute la séquence en un seul appel, sans
+    dispatch PyTorch par opération. Les poids sont transposés (in, out).
+    fused_x: (batch, seq, 3*hidden) ; residual: (batch, seq, hidden), déjà à l'échelle
+    """
+    bsz, seq_len, hidden = residual.shape
+    H2 = 2 * hidden
+    dtype = residual.dtype
+    states = np.empty((bsz, seq_len, hidden), dtype=dtype)
+    gates = np.empty((bsz, seq_len), dtype=dtype)
+    h_ctx = np.empty((bsz, H2), dtype=dtype)
+    # états mis à jour sur place : types fixes pour numba
+    prev2 = h_prev2.copy()
+    prev1 = h_prev1.copy()
+    for t in range(seq_len):
+        h_ctx[:, :hidden] = prev1
+        h_ctx[:, hidden:] = prev2
+        fused = fused_x[:, t] + h_ctx @ w_h
+        candidate = np.maximum(fused[:, :H2], 0.0).astype(dtype) @ w_cand + b_cand
+        gate = 1.0 / (1.0 + np.exp(-(np.tanh(fused[:, H2:]) @ w_gate + b_gate)))   # (batch, 1)
+        h_t = prev1 + residual[:, t] + gate * candidate
+        # layer norm (sans affine, eps de F.layer_norm)
+        for b in range(bsz):
+            centered = h_t[b] - h_t[b].mean()
+            h_t[b] = centered / np.sqrt((centered * centered).mean() + 1e-5)
+        states[:, t] = h_t
+        gates[:, t] = gate[:, 0]
+        prev2[:] = prev1
+        prev1[:] = h_t
+    return states, gates
+
+
+def _extend_buffer(buffer: torch.Tensor, length: int, new: torch.Tensor) -> torch.Tensor:
+    """
+    Écrit new (batch, n, ...) après les length premières positions de buffer.
+    La capacité est doublée quand le tampon est plein, ce qui évite de
+    recopier tout l'historique à chaque token. Avec autograd actif, un
+    nouveau tampon est toujours alloué (pas d'écriture sur place dans un
+    tenseur déjà utilisé par le graphe).
+    """
+    needed = length + new.shape[1]
+    if needed > buffer.shape[1] or torch.is_grad_enabled():
+        capacity = needed if torch.is_grad_enabled() else max(needed, 2 * buffer.shape[1])
+        grown = new.new_empty(buffer.shape[0], capacity, *buffer.shape[2:])
+        grown[:, :length] = buffer[:, :length]
+        buffer = grown
+    buffer[:, length:needed] = new
+    return buffer
+
+
+def _cpu_has_native_bf16() -> bool:
+    """
+    True si le CPU exécute les GEMM bfloat16 nativement (drapeaux cpuinfo
+    avx512_bf16 ou amx_bf16). AVX512 seul ne suffit pas : oneDNN émule
+    alors le BF16, plus lentement que le float32. Si cette version de
+    torch n'expose pas ces drapeaux, on reste en float32.
+    """
+    try:
+        return torch.cpu._is_avx512_bf16_supported() or torch.cpu._is_amx_tile_supported()
+    except (AttributeError, RuntimeError):
+        return False
+
 
 class ARSLM(nn.Module):
     """
     ARSLM: embedding -> stacked ARSCell(s) -> additive attention -> head
     Designed to be simple and robust for small demos.
     """
-    def __init__(self, tokenizer: AdvancedTokenizer, emb_dim: int = 64, hidden_dim: int = 128, num_layers: int = 2):
+    def __init__(self, tokenizer: AdvancedTokenizer, emb_dim: int = 64, hidden_dim: int = 128, num_layers: int = 2,
+                 prompt_cache_size: int = 512):
         super().__init__()
         self.tokenizer = tokenizer
         self.vocab_size = len(tokenizer)
@@ -126,142 +275,281 @@ class ARSLM(nn.Module):
             nn.Linear(hidden_dim, 1)
         )
         self.head = nn.Linear(hidden_dim, self.vocab_size)
+        # étape de décodage (un token) utilisée par generate, voir enable_compile
+        self._decode_step = None
+        # boucle t compilée par numba, voir enable_jit
+        self._scan_kernel = None
+        # autocast BF16 de generate sur CPU, voir enable_bf16
+        self._cpu_bf16 = False
+        # cache LRU par instance des prompts texte déjà vus, voir embed_prompt
+        self.prompt_cache_size = prompt_cache_size
+        self._prompt_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+
+    def __getstate__(self):
+        # les entrées du cache de prompts ne sont pas sérialisées : une copie
+        # (pickle, deepcopy, torch.save) repart d'un cache vide sur ses propres poids
+        state = super().__getstate__()
+        state["_prompt_cache"] = OrderedDict()
+        return state
+
+    def forward(self, input_ids: torch.Tensor, past=None, use_cache: bool = False, only_last: bool = False):
+        """
+        input_ids: (batch, seq_len) ; voir forward_from_emb
+        """
+        return self.forward_from_emb(self.emb(input_ids), past=past, use_cache=use_cache, only_last=only_last)
 
-    def forward(self, input_ids: torch.Tensor):
+    def forward_from_emb(self, emb: torch.Tensor, past=None, use_cache: bool = False, only_last: bool = False):
         """
-        input_ids: (batch, seq_len)
-        returns logits: (batch, seq_len, vocab) and gates from last layer (batch, seq_len)
+        emb: (batch, seq_len, emb_dim) embeddings des tokens d'entrée
+        past: état renvoyé par un appel précédent avec use_cache=True ; seuls
+              les nouveaux tokens sont alors traités (génération incrémentale)
+        only_last: n'évalue l'attention et la tête que pour la dernière
+              position (logits et gates de longueur 1), suffisant pour générer
+        returns logits: (batch, seq_len, vocab) and gates from last layer (batch, seq_len),
+                plus the updated past when use_cache=True
+
+        past = (h_prev2_list, h_prev1_list, history, scores, past_len) : états
+        des cellules par couche, historique de la dernière couche
+        (batch, capacity, hidden_dim) et scores d'attention déjà calculés
+        (batch, capacity), dont seules les past_len premières positions sont
+        valides. Le score d'un état ne dépend que de cet état, il n'est donc
+        calculé qu'une fois. Les tampons sont préalloués et remplis sur place
+        (hors autograd) : un past ne doit plus être réutilisé une fois étendu.
         """
-        bsz, seq_len = input_ids.shape
-        emb = self.emb(input_ids)            # (b, seq, emb_dim)
+        bsz, seq_len = emb.shape[:2]
         device = emb.device
         hidden_dim = self.hidden_dim
+        # noyau numba (enable_jit) : inférence CPU float32 seulement, pour le
+        # prefill ; un token seul reste plus rapide en PyTorch (pas de conversion)
+        scan_kernel = None
+        if (self._scan_kernel is not None and seq_len > 1 and not self.training
+                and not torch.is_grad_enabled() and device.type == "cpu" and emb.dtype == torch.float32):
+            scan_kernel = self._scan_kernel
+
+        if past is None:
+            # initialize previous states per layer: one shared zero tensor (never
+            # written in place, the loop only rebinds the per-layer entries)
+            zeros = emb.new_zeros(bsz, hidden_dim)
+            h_prev2_list = [zeros] * self.num_layers
+            h_prev1_list = [zeros] * self.num_layers
+            past_history = emb.new_zeros(bsz, 0, hidden_dim)
+            past_scores = emb.new_zeros(bsz, 0)
+            past_len = 0
+        else:
+            h_prev2_list, h_prev1_list, past_history, past_scores, past_len = past
+            h_prev2_list, h_prev1_list = list(h_prev2_list), list(h_prev1_list)
+
+        if seq_len == 0:
+            # rien à traiter : les états (et le past) restent inchangés
+            logits = torch.zeros(bsz, 0, self.vocab_size, device=device)
+            gates = torch.zeros(bsz, 0, device=device)
+            if use_cache:
+                return logits, gates, (h_prev2_list, h_prev1_list, past_history, past_scores, past_len)
+            return logits, gates
+
+        layer_input = emb
+        for layer in range(self.num_layers):
+            cell = self.cells[layer]
+            h_prev2, h_prev1 = h_prev2_list[layer], h_prev1_list[layer]
+
+            if scan_kernel is not None:
+                projected = cell.project_input(layer_input)
+                # sous autocast la projection n'est plus en float32 : chemin PyTorch
+                if projected[0].dtype == torch.float32:
+                    layer_input, gates = cell.scan(h_prev2, h_prev1, projected, scan_kernel)
+                    h_prev2_list[layer], h_prev1_list[layer] = layer_input[:, -2], layer_input[:, -1]
+                    continue
+                scan_kernel = None
+
+            if seq_len == 1:
+                # single new token (incremental decoding): plain cell call
+                h_t, gate = cell(h_prev2, h_prev1, layer_input[:, 0])
+                layer_states, gates_list = [h_t], [gate]
+                h_prev2, h_prev1 = h_prev1, h_t
+            else:
+                # layer by layer: the input projection of a layer is one GEMM over
+                # the whole sequence, only the h_{t-1}/h_{t-2} part runs in the t-loop
+                # only the last layer's gates are returned
+                last_layer = layer == self.num_layers - 1
+                fused_x, residual = cell.project_input(layer_input)
+                layer_states = []
+                gates_list = []
+                # unbind once: per-step views without one indexing op per tensor and step
+                for projected in zip(fused_x.unbind(1), residual.unbind(1)):
+                    h_t, gate = cell.step(h_prev2, h_prev1, projected)
+                    layer_states.append(h_t)
+                    if last_layer:
+                        gates_list.append(gate)
+
+                    # update for next time-step
+                    h_prev2, h_prev1 = h_prev1, h_t
+
+            h_prev2_list[layer], h_prev1_list[layer] = h_prev2, h_prev1
+            layer_input = torch.stack(layer_states, dim=1)          # (b, seq, hidden_dim)
+
+        states = layer_input                                        # (b, seq, hidden_dim)
+        if scan_kernel is None:
+            gates = torch.stack(gates_list, dim=1)                  # (b, seq), last layer
+
+        # score each new history element once, in a single batched call
+        scores = self.attention(states).squeeze(-1)                 # (b, seq)
+        total = past_len + seq_len
+        history_buffer = _extend_buffer(past_history, past_len, states)
+        scores_buffer = _extend_buffer(past_scores, past_len, scores)
+        history = history_buffer[:, :total]                         # (b, past+seq, hidden_dim)
+        all_scores = scores_buffer[:, :total]                       # (b, past+seq)
+
+        if only_last:
+            # the last position sees the whole history: no causal mask, and the
+            # context/head run for one query instead of seq_len
+            states = states[:, -1:]
+            gates = gates[:, -1:]
+            attn_weights = F.softmax(all_scores, dim=-1).unsqueeze(1)   # (b, 1, past+seq)
+        else:
+            # causal attention over history: position t sees states 0..past_len+t
+            positions = torch.arange(total, device=device)
+            causal = positions.unsqueeze(0) <= positions[past_len:].unsqueeze(1)   # (seq, past+seq)
+            attn_scores = all_scores.unsqueeze(1).masked_fill(~causal, float('-inf'))
+            attn_weights = F.softmax(attn_scores, dim=-1)               # (b, seq, past+seq)
+        context = torch.bmm(attn_weights, history)                  # (b, seq, hidden_dim)
+
+        logits = self.head(states + context)                        # (b, seq, vocab)
+
+        if use_cache:
+            return logits, gates, (h_prev2_list, h_prev1_list, history_buffer, scores_buffer, total)
+        return logits, gates
 
-        # initialize previous states per layer
-        h_prev2_list = [torch.zeros(bsz, hidden_dim, device=device) for _ in range(self.num_layers)]
-        h_prev1_list = [torch.zeros(bsz, hidden_dim, device=device) for _ in range(self.num_layers)]
-
-        all_last_layer_hidden_states = []  # store history for attention
-        logits_list = []
-        gates_list = []
-
-        for t in range(seq_len):
-            x_t = emb[:, t, :]   # (b, emb_dim)
-            h_t_input = x_t
-
-            current_layer_hidden_states = []
-
-            for layer in range(self.num_layers):
-                cell = self.cells[layer]
-                h_prev2 = h_prev2_list[layer]
-                h_prev1 = h_prev1_list[layer]
-
-                if layer > 0:
-                    h_t_input = current_layer_hidden_states[-1]
-
-                h_t, gate = cell(h_prev2, h_prev1, h_t_input)
-                current_layer_hidden_states.append(h_t)
-
-                # update for next time-step
-                h_prev2_list[layer] = h_prev1
-                h_prev1_list[layer] = h_t
-
-                if layer == self.num_layers - 1:
-                    gates_list.append(gate.unsqueeze(1))  # (b,1)
-
-            last_layer_h_t = current_layer_hidden_states[-1]  # (b, hidden_dim)
-            all_last_layer_hidden_states.append(last_layer_h_t.unsqueeze(1))  # keep history
+    def enable_compile(self, warmup: bool = True, **compile_kwargs) -> bool:
+        """
+        Compile l'étape de décodage incrémental (un token par appel) avec
+        torch.compile ; generate l'utilise ensuite pour chaque nouveau token.
+        Le prefill (taille de séquence variable, boucle Python sur t) reste
+        en eager : le compiler déroulerait la boucle pour chaque longueur.
+        warmup: lance une courte génération pour payer la compilation ici
+        plutôt qu'à la première requête.
+        Retourne True si la version compilée est active.
+        """
+        if not hasattr(torch, "compile"):
+            return False
 
-            # attention over history (causal), last_layer_history shape: (b, t+1, hidden_dim)
-            last_layer_history = torch.cat(all_last_layer_hidden_states, dim=1)  # (b, t+1, hidden_dim)
-            # score each history element
-            scores = self.attention(last_layer_history).squeeze(-1)  # (b, t+1)
-            attn_weights = F.softmax(scores, dim=1).unsqueeze(-1)    # (b, t+1, 1)
-            context = torch.sum(attn_weights * last_layer_history, dim=1)  # (b, hidden_dim)
+        compile_kwargs.setdefault("dynamic", True)
+        self._decode_step = torch.compile(self.forward, **compile_kwargs)
 
-            attended_h_t = last_layer_h_t + context
-            logit = self.head(attended_h_t)   # (b, vocab)
-            logits_list.append(logit.unsqueeze(1))
+        if warmup:
+            device = next(self.parameters()).device
+            dummy = torch.full((1, 2), self.tokenizer.pad_token_id, dtype=torch.long, device=device)
+            self.generate(dummy, max_new_tokens=4)
+        return True
 
-        logits = torch.cat(logits_list, dim=1) if logits_list else torch.zeros(bsz, 0, self.vocab_size, device=device)
-        gates = torch.cat(gates_list, dim=1) if gates_list else torch.zeros(bsz, 0, device=device)
-        return logits, gates
+    def embed_prompt(self, text: str):
+        """
+        Renvoie (input_ids (1, seq), embeddings (1, seq, emb_dim)) du prompt
+        BOS + text. Mis en cache (LRU) : un prompt répété n'est ni re-tokenisé
+        ni re-converti en tenseur, et l'embedding n'est pas recalculé.
+        La clé inclut le stockage et la version des poids de l'embedding :
+        un pas d'optimisation, un load_state_dict ou un .to() invalident
+        donc les entrées existantes.
+        """
+        weight = self.emb.weight
+        key = (text, weight.data_ptr(), weight._version)
+        cached = self._prompt_cache.get(key)
+        if cached is not None:
+            self._prompt_cache.move_to_end(key)
+            return cached
+        ids = [self.tokenizer.bos_token_id] + self.tokenizer.encode(text)
+        with torch.no_grad():
+            idx = torch.tensor([ids], dtype=torch.long, device=weight.device)
+            cached = idx, self.emb(idx)
+        if self.prompt_cache_size > 0:
+            self._prompt_cache[key] = cached
+            while len(self._prompt_cache) > self.prompt_cache_size:
+                self._prompt_cache.popitem(last=False)
+        return cached
+
+    def enable_jit(self, warmup: bool = True) -> bool:
+        """
+        Remplace la boucle t des cellules par _ars_scan compilé avec
+        numba.njit pour le prefill en inférence CPU (generate, ou forward en
+        eval sous no_grad) ; l'entraînement garde le chemin PyTorch.
+        warmup: compile ici (premier appel lent) plutôt qu'à la première requête.
+        Sans numba (ou scipy, requis par numba pour les produits matriciels),
+        rien ne change. Retourne True si le noyau est actif.
+        """
+        if numba is None:
+            return False
+
+        self._scan_kernel = numba.njit(cache=True, fastmath=True)(_ars_scan)
+
+        if warmup and next(self.parameters()).device.type == "cpu":
+            dummy = torch.full((1, 2), self.tokenizer.pad_token_id, dtype=torch.long)
+            try:
+                self.generate(dummy, max_new_tokens=2)
+            except Exception:
+                # compilation impossible (ex. numba sans scipy pour le BLAS)
+                self._scan_kernel = None
+                return False
+        return True
+
+    def enable_bf16(self, force: bool = False) -> bool:
+        """
+        Active l'autocast BF16 de generate sur CPU : les GEMM (cellules,
+        attention, tête) passent en bfloat16, normes et softmax restent en
+        float32. Seulement utile avec des instructions BF16 natives
+        (AVX512-BF16 / AMX) : sans elles, l'émulation est plus lente, donc
+        refusé sauf force=True. Les poids sont convertis à chaque appel :
+        gain pour des lots de plusieurs séquences, perte pour batch=1.
+        Retourne True si l'autocast est actif.
+        """
+        self._cpu_bf16 = force or _cpu_has_native_bf16()
+        return self._cpu_bf16
 
-    @torch.no_grad()
-    def generate(self, idx: torch.Tensor, max_new_tokens: int = 20, temperature: float = 1.0):
+    @torch.inference_mode()
+    def generate(self, idx: torch.Tensor, max_new_tokens: int = 20, temperature: float = 1.0,
+                 inputs_embeds: torch.Tensor = None):
         """
         idx: (batch, seq_len) initial context
+        inputs_embeds: embeddings de idx déjà calculés (voir embed_prompt)
         returns: list of lists (token ids) expanded
+
+        Le contexte est traité une seule fois, puis chaque nouveau token
+        réutilise l'état en cache (past) au lieu de recalculer l'historique.
         """
         if temperature <= 0:
             raise ValueError("temperature must be > 0")
 
         self.eval()
-        bsz, seq_len = idx.shape
         device = next(self.parameters()).device
-        hidden_dim = self.hidden_dim
-
-        # init states
-        h_prev2_list = [torch.zeros(bsz, hidden_dim, device=device) for _ in range(self.num_layers)]
-        h_prev1_list = [torch.zeros(bsz, hidden_dim, device=device) for _ in range(self.num_layers)]
-        all_last_layer_hidden_states = []
+        idx = idx.to(device)
 
         # process initial context to set starting hidden states
-        emb = self.emb(idx)  # (b, seq_len, emb_dim)
-        for t in range(seq_len):
-            x_t = emb[:, t, :]
-            h_t_input = x_t
-            current_layer_hidden_states = []
-            for layer in range(self.num_layers):
-                cell = self.cells[layer]
-                h_prev2 = h_prev2_list[layer]
-                h_prev1 = h_prev1_list[layer]
-                if layer > 0:
-                    h_t_input = current_layer_hidden_states[-1]
-                h_t, _ = cell(h_prev2, h_prev1, h_t_input)
-                current_layer_hidden_states.append(h_t)
-                h_prev2_list[layer] = h_prev1
-                h_prev1_list[layer] = h_t
-                if layer == self.num_layers - 1:
-                    all_last_layer_hidden_states.append(h_t.unsqueeze(1))
-
-        out_ids = [list(row.tolist()) for row in idx.cpu()]
-
+        if inputs_embeds is None:
+            inputs_embeds = self.emb(idx)
+        autocast = torch.autocast("cpu", dtype=torch.bfloat16, enabled=self._cpu_bf16 and device.type == "cpu")
+        with autocast:
+            logits, _, past = self.forward_from_emb(inputs_embeds, use_cache=True, only_last=True)
+        decode_step = self._decode_step or self
+
+        new_tokens = []
         for _ in range(max_new_tokens):
-            # embedding of last token for each sequence in the batch
-            last_token_ids = torch.tensor([ids[-1] for ids in out_ids], dtype=torch.long, device=device).unsqueeze(1)
-            x_embed = self.emb(last_token_ids).squeeze(1)
-
-            h_t_input = x_embed
-            current_layer_hidden_states = []
-            for layer in range(self.num_layers):
-                cell = self.cells[layer]
-                h_prev2 = h_prev2_list[layer]
-                h_prev1 = h_prev1_list[layer]
-                if layer > 0:
-                    h_t_input = current_layer_hidden_states[-1]
-                h_t, _ = cell(h_prev2, h_prev1, h_t_input)
-                current_layer_hidden_states.append(h_t)
-                h_prev2_list[layer] = h_prev1
-                h_prev1_list[layer] = h_t
-                if layer == self.num_layers - 1:
-                    all_last_layer_hidden_states.append(h_t.unsqueeze(1))
-
-            last_layer_h_t = current_layer_hidden_states[-1]
-            last_layer_history = torch.cat(all_last_layer_hidden_states, dim=1)  # (b, seq, hidden_dim)
-            scores = self.attention(last_layer_history).squeeze(-1)
-            attn_weights = F.softmax(scores, dim=1).unsqueeze(-1)
-            context = torch.sum(attn_weights * last_layer_history, dim=1)
-            attended_h_t = last_layer_h_t + context
-
-            logits = self.head(attended_h_t) / float(temperature)
-            probs = F.softmax(logits, dim=-1)
-            next_token = torch.multinomial(probs, num_samples=1).squeeze(-1)  # (b,)
-
-            for i in range(bsz):
-                out_ids[i].append(int(next_token[i].item()))
-
-        return out_ids
+            probs = F.softmax(logits[:, -1, :].float() / float(temperature), dim=-1)
+            next_token = torch.multinomial(probs, num_samples=1)    # (b, 1)
+            new_tokens.append(next_token)
+
+            if len(new_tokens) < max_new_tokens:
+                with autocast:
+                    logits, _, past = decode_step(next_token, past=past, use_cache=True, only_last=True)
+
+        out = torch.cat([idx] + new_tokens, dim=1)
+        return [list(row) for row in out.tolist()]
+
+    def generate_text(self, prompt: str, max_new_tokens: int = 20, temperature: float = 1.0) -> str:
+        """
+        Génère la suite d'un prompt texte et renvoie le texte décodé
+        (prompt inclus) ; le prompt passe par le cache de embed_prompt.
+        """
+        idx, emb = self.embed_prompt(prompt)
+        out_ids = self.generate(idx, max_new_tokens=max_new_tokens, temperature=temperature, inputs_embeds=emb)[0]
+        return self.tokenizer.decode(out_ids)
 
 
 # Utilities
@@ -323,10 +611,7 @@ def train_demo(device: torch.device = None, n_epochs: int = 200, seed: int = 0):
             print(f"Epoch {epoch+1}/{n_epochs} — loss: {loss.item():.4f}")
 
     # Demo generation
-    context = "hello world"
-    idx = torch.tensor([[tokenizer.bos_token_id] + tokenizer.encode(context)], dtype=torch.long, device=device)
-    out_ids = model.generate(idx, max_new_tokens=15, temperature=1.0)[0]
     print("=== Generated ===")
-    print(tokenizer.decode(out_ids))
+    print(model.generate_text("hello world", max_new_tokens=15, temperature=1.0))
 
     return model, tokenizer
@@ -24,6 +24,7 @@ Email: benjokama@hotmail.fr
 License: MIT
 """
 
+import importlib
 import sys
 import warnings
 from typing import List
@@ -42,39 +43,59 @@ if sys.version_info < (3, 8):
         f"You are using Python {sys.version_info.major}.{sys.version_info.minor}."
     )
 
-# Import core components
-try:
-    from arslm.core.model import ARSLM, ARSLMConfig
-    from arslm.core.attention import (
-        MultiHeadAttention,
-        SelfAttention,
-        CrossAttention,
-    )
-    from arslm.core.recurrent import AdaptiveRNN, AdaptiveLSTM, AdaptiveGRU
-    from arslm.core.adaptive import AdaptiveLayer, DynamicRouter
-    
-    from arslm.utils.tokenizer import ARSLMTokenizer
-    from arslm.utils.config import Config, load_config, save_config
-    from arslm.utils.preprocessing import TextPreprocessor
+# Core components are imported lazily on first attribute access (PEP 562),
+# so tools that only need e.g. the tokenizer don't pay for torch and the
+# full model graph at import time
+_LAZY = {
+    "ARSLM": "arslm.core.model",
+    "ARSLMConfig": "arslm.core.model",
+    "MultiHeadAttention": "arslm.core.attention",
+    "SelfAttention": "arslm.core.attention",
+    "CrossAttention": "arslm.core.attention",
+    "AdaptiveRNN": "arslm.core.recurrent",
+    "AdaptiveLSTM": "arslm.core.recurrent",
+    "AdaptiveGRU": "arslm.core.recurrent",
+    "AdaptiveLayer": "arslm.core.adaptive",
+    "DynamicRouter": "arslm.core.adaptive",
+    "ARSLMTokenizer": "arslm.utils.tokenizer",
+    "Config": "arslm.utils.config",
+    "load_config": "arslm.utils.config",
+    "save_config": "arslm.utils.config",
+    "TextPreprocessor": "arslm.utils.preprocessing",
+    "ARSLMClient": "arslm.api.client",
+    "ChatRequest": "arslm.api.schemas",
+    "ChatResponse": "arslm.api.schemas",
+    "GenerationRequest": "arslm.api.schemas",
+    "GenerationResponse": "arslm.api.schemas",
+}
+
+# Minimal exports that resolve to None when their module can't be imported
+_OPTIONAL = {"ARSLM", "ARSLMConfig", "ARSLMTokenizer", "ARSLMClient"}
+
+
+def __getattr__(name: str):
+    """Import a core component on first access and cache it."""
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
     
-    from arslm.api.client import ARSLMClient
-    from arslm.api.schemas import (
-        ChatRequest,
-        ChatResponse,
-        GenerationRequest,
-        GenerationResponse,
-    )
+    try:
+        module = importlib.import_module(_LAZY[name])
+        value = getattr(module, name)
+    except ImportError as e:
+        if name not in _OPTIONAL:
+            raise
+        warnings.warn(
+            f"Some components could not be imported: {e}. "
+            f"This might be normal during initial setup."
+        )
+        value = None
     
-except ImportError as e:
-    warnings.warn(
-        f"Some components could not be imported: {e}. "
-        f"This might be normal during initial setup."
-    )
-    # Define minimal exports for installation
-    ARSLM = None
-    ARSLMConfig = None
-    ARSLMTokenizer = None
-    ARSLMClient = None
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_LAZY))
 
 # Define public API
 __all__: List[str] = [
@@ -6,8 +6,13 @@ st.set_page_config(page_title="ARSLM Prototype", page_icon="🤖", layout="cente
 st.title("🤖 ARSLM — Prototype LLM")
 st.markdown("Testez le modèle ARSLM avec du texte ou un fichier `.txt`")
 
-# Initialisation du modèle
-model = ARSLM()
+# Initialisation du modèle : une seule instance par processus, partagée par
+# les réexécutions du script et les sessions (au lieu d'une par interaction)
+@st.cache_resource
+def load_model():
+    return ARSLM()
+
+model = load_model()
 
 # Sidebar pour options d'entrée
 st.sidebar.header("Options d'entrée")
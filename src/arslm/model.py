@@ -165,6 +165,31 @@ class ARSLMModel(nn.Module):
             elif isinstance(module, nn.Embedding):
                 torch.nn.init.normal_(module.weight, mean=0, std=0.02)
     
+    def quantize_for_inference(self) -> "ARSLMModel":
+        """
+        Quantize weights to int8 for CPU inference.
+        
+        All Linears (attention, feed-forward and the vocabulary head) are
+        swapped for dynamically quantized int8 Linears, and the token
+        embedding table is stored as per-row quantized uint8. LayerNorm,
+        softmax and the position embedding stay in FP32. The model is put
+        in eval mode and should not be trained afterwards.
+        
+        Returns:
+            self
+        """
+        self.eval()
+        torch.ao.quantization.quantize_dynamic(
+            self,
+            {
+                nn.Linear: torch.ao.quantization.default_dynamic_qconfig,
+                'token_embedding': torch.ao.quantization.float_qparams_weight_only_qconfig
+            },
+            dtype=torch.qint8,
+            inplace=True
+        )
+        return self
+    
     def forward(
         self,
         input_ids: torch.Tensor,
@@ -10,6 +10,8 @@ import re
 import json
 from pathlib import Path
 
+import numpy as np
+
 
 class SimpleTokenizer:
     """
@@ -22,6 +24,9 @@ class SimpleTokenizer:
         - <UNK> (3): Unknown token
     """
     
+    # Sequences at least this long are decoded with an array gather
+    _GATHER_MIN_LENGTH = 16
+    
     def __init__(self, vocab_size: int = 50000):
         """
         Initialize tokenizer.
@@ -46,6 +51,10 @@ class SimpleTokenizer:
         # Next available ID
         self.next_id = len(self.special_tokens)
         
+        # Array-based reverse vocabulary, built on first long decode
+        self._decode_table = None
+        self._special_mask = None
+        
         # Compiled patterns for tokenization
         self.word_pattern = re.compile(r'\w+|[^\w\s]')
         
@@ -107,6 +116,7 @@ class SimpleTokenizer:
                     self.token_to_id[token] = token_id
                     self.id_to_token[token_id] = token
                     self.next_id += 1
+                    self._decode_table = None
                     token_ids.append(token_id)
                 else:
                     token_ids.append(self.special_tokens['<UNK>'])
@@ -140,19 +150,37 @@ class SimpleTokenizer:
         Returns:
             Decoded text
         """
-        tokens = []
-        
-        for token_id in token_ids:
-            if token_id in self.id_to_token:
-                token = self.id_to_token[token_id]
-                
-                # Skip special tokens if requested
-                if skip_special_tokens and token in self.special_tokens:
-                    continue
-                
-                tokens.append(token)
-            else:
-                tokens.append('<UNK>')
+        if isinstance(token_ids, list) and len(token_ids) < self._GATHER_MIN_LENGTH:
+            # Short sequences (e.g. streamed tokens) are cheaper to look up
+            # in the dict than to convert to an array
+            tokens = []
+            
+            for token_id in token_ids:
+                if token_id in self.id_to_token:
+                    token = self.id_to_token[token_id]
+                    
+                    # Skip special tokens if requested
+                    if skip_special_tokens and token in self.special_tokens:
+                        continue
+                    
+                    tokens.append(token)
+                else:
+                    tokens.append('<UNK>')
+        else:
+            if self._decode_table is None:
+                self._build_decode_table()
+            
+            # One conversion for the whole sequence; unknown IDs point at
+            # the trailing <UNK> slot
+            ids = np.asarray(token_ids, dtype=np.int64)
+            unknown_slot = len(self._decode_table) - 1
+            ids = np.where((ids < 0) | (ids >= unknown_slot), unknown_slot, ids)
+            
+            # Skip special tokens if requested
+            if skip_special_tokens:
+                ids = ids[~self._special_mask[ids]]
+            
+            tokens = self._decode_table[ids].tolist()
         
         # Join tokens with spaces
         text = ' '.join(tokens)
@@ -162,6 +190,27 @@ class SimpleTokenizer:
         
         return text
     
+    def _build_decode_table(self) -> None:
+        """
+        Build the array-based reverse vocabulary used for long decodes.
+        
+        ``_decode_table[i]`` is the token of ID ``i``; gaps and the extra
+        last slot (used for out-of-range IDs) hold <UNK>, which is not
+        skipped as a special token. ``_special_mask`` flags IDs skipped by
+        skip_special_tokens.
+        """
+        size = max(self.id_to_token, default=-1) + 1
+        table = np.full(size + 1, '<UNK>', dtype=object)
+        special = np.zeros(size + 1, dtype=bool)
+        
+        for token_id, token in self.id_to_token.items():
+            if token_id >= 0:
+                table[token_id] = token
+                special[token_id] = token in self.special_tokens
+        
+        self._decode_table = table
+        self._special_mask = special
+    
     def _clean_text(self, text: str) -> str:
         """Clean up decoded text."""
         # Remove spaces before punctuation
@@ -258,6 +307,7 @@ class SimpleTokenizer:
         
         # Rebuild reverse mapping
         self.id_to_token = {v: k for k, v in self.token_to_id.items()}
+        self._decode_table = None
     
     def get_vocab_size(self) -> int:
         """Get current vocabulary size."""
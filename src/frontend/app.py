@@ -5,10 +5,12 @@ Interactive web interface for ARSLM chatbot.
 """
 
 import streamlit as st
-import requests
-from datetime import datetime
+import httpx
+import html
+import importlib.util
 import uuid
 import os
+import time
 from typing import List, Dict
 import json
 
@@ -24,10 +26,27 @@ st.set_page_config(
 API_BASE_URL = os.getenv("API_URL", "http://localhost:8000")
 
 
+@st.cache_resource
+def get_http_client() -> httpx.Client:
+    """
+    Get the shared HTTP client.
+    
+    One keep-alive connection pool is reused by every rerun and session
+    instead of opening a new connection per request. HTTP/2 is used when
+    the ``h2`` package is installed.
+    """
+    return httpx.Client(
+        base_url=API_BASE_URL,
+        http2=importlib.util.find_spec('h2') is not None,
+        timeout=30.0
+    )
+
+
 # Custom CSS
-def load_css():
-    """Load custom CSS styles."""
-    st.markdown("""
+@st.cache_data
+def load_css() -> str:
+    """Build custom CSS styles (computed once, reused on every rerun)."""
+    return """
     <style>
     .main-header {
         font-size: 2.5rem;
@@ -70,7 +89,7 @@ def load_css():
         margin-bottom: 1rem;
     }
     </style>
-    """, unsafe_allow_html=True)
+    """
 
 
 def initialize_session():
@@ -78,17 +97,50 @@ def initialize_session():
     if 'session_id' not in st.session_state:
         st.session_state.session_id = str(uuid.uuid4())
     
-    if 'messages' not in st.session_state:
-        st.session_state.messages = []
+    if 'rendered' not in st.session_state:
+        reset_messages()
     
     if 'api_available' not in st.session_state:
         st.session_state.api_available = check_api_health()
 
 
+def reset_messages():
+    """
+    Reset the chat history.
+    
+    Messages are stored as parallel lists (roles, contents, timestamps)
+    rather than one dict per message, alongside their rendered HTML.
+    """
+    st.session_state.roles = []
+    st.session_state.contents = []
+    st.session_state.timestamps = []
+    st.session_state.rendered = []
+
+
+def current_time() -> str:
+    """Return the local time of day as HH:MM:SS."""
+    # time.strftime skips building a datetime object on every message
+    return time.strftime("%H:%M:%S")
+
+
+def add_message(role: str, content: str, timestamp: str):
+    """
+    Append a message to the chat history.
+    
+    The message is rendered once here, so reruns only re-emit the
+    cached HTML instead of re-rendering the whole conversation.
+    """
+    st.session_state.roles.append(role)
+    st.session_state.contents.append(content)
+    st.session_state.timestamps.append(timestamp)
+    st.session_state.rendered.append(render_message(role, content, timestamp))
+
+
+@st.cache_data(ttl=10, show_spinner=False)
 def check_api_health() -> bool:
-    """Check if API is available."""
+    """Check if API is available (result cached for 10 seconds)."""
     try:
-        response = requests.get(f"{API_BASE_URL}/health", timeout=5)
+        response = get_http_client().get("/health", timeout=1.0)
         return response.status_code == 200
     except:
         return False
@@ -106,18 +158,17 @@ def send_message(message: str, params: Dict) -> Dict:
         API response
     """
     try:
-        response = requests.post(
-            f"{API_BASE_URL}/api/v1/chat",
+        response = get_http_client().post(
+            "/api/v1/chat",
             json={
                 "message": message,
                 "session_id": st.session_state.session_id,
                 **params
-            },
-            timeout=30
+            }
         )
         response.raise_for_status()
         return response.json()
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         st.error(f"Error communicating with API: {str(e)}")
         return None
 
@@ -125,8 +176,8 @@ def send_message(message: str, params: Dict) -> Dict:
 def get_conversation_history() -> List[Dict]:
     """Get conversation history from API."""
     try:
-        response = requests.get(
-            f"{API_BASE_URL}/api/v1/history/{st.session_state.session_id}",
+        response = get_http_client().get(
+            f"/api/v1/history/{st.session_state.session_id}",
             timeout=5
         )
         if response.status_code == 200:
@@ -139,12 +190,12 @@ def get_conversation_history() -> List[Dict]:
 def clear_conversation_history():
     """Clear conversation history."""
     try:
-        response = requests.delete(
-            f"{API_BASE_URL}/api/v1/history/{st.session_state.session_id}",
+        response = get_http_client().delete(
+            f"/api/v1/history/{st.session_state.session_id}",
             timeout=5
         )
         if response.status_code == 200:
-            st.session_state.messages = []
+            reset_messages()
             st.success("Conversation history cleared!")
         else:
             st.error("Failed to clear history")
@@ -152,21 +203,54 @@ def clear_conversation_history():
         st.error(f"Error clearing history: {str(e)}")
 
 
-def display_message(role: str, content: str, timestamp: str = None):
-    """Display a chat message."""
-    css_class = "user-message" if role == "user" else "assistant-message"
-    icon = "👤" if role == "user" else "🤖"
+# Static per-role message styling: (css class, icon, label)
+ROLE_STYLES = {
+    'user': ("user-message", "👤", "User"),
+    'assistant': ("assistant-message", "🤖", "Assistant"),
+}
+
+
+# Chat message markup, filled with str.format
+MESSAGE_TEMPLATE = (
+    '<div class="chat-message {css_class}">'
+    '<div class="message-role">{icon} {label}</div>'
+    '<div class="message-content">{content}</div>'
+    '<div class="message-time">{timestamp}</div>'
+    '</div>'
+)
+
+
+def render_message(role: str, content: str, timestamp: str = None) -> str:
+    """
+    Render a chat message as HTML.
+    
+    Content and timestamp are HTML-escaped, so message text can't inject
+    markup into the page.
+    """
+    css_class, icon, label = ROLE_STYLES.get(
+        role, ("assistant-message", "🤖", html.escape(role.capitalize()))
+    )
     
     if timestamp is None:
-        timestamp = datetime.now().strftime("%H:%M:%S")
+        timestamp = current_time()
     
-    st.markdown(f"""
-    <div class="chat-message {css_class}">
-        <div class="message-role">{icon} {role.capitalize()}</div>
-        <div class="message-content">{content}</div>
-        <div class="message-time">{timestamp}</div>
-    </div>
-    """, unsafe_allow_html=True)
+    return MESSAGE_TEMPLATE.format(
+        css_class=css_class,
+        icon=icon,
+        label=label,
+        content=html.escape(content),
+        timestamp=html.escape(timestamp)
+    )
+
+
+def display_message(role: str, content: str, timestamp: str = None):
+    """Display a chat message."""
+    st.markdown(render_message(role, content, timestamp), unsafe_allow_html=True)
+
+
+def display_messages(rendered: List[str]):
+    """Display a conversation of pre-rendered messages with a single st.markdown call."""
+    st.markdown("".join(rendered), unsafe_allow_html=True)
 
 
 def sidebar():
@@ -181,6 +265,7 @@ def sidebar():
             else:
                 st.error("❌ API is offline")
                 if st.button("🔄 Retry Connection"):
+                    check_api_health.clear()
                     st.session_state.api_available = check_api_health()
                     st.rerun()
         
@@ -226,7 +311,7 @@ def sidebar():
             <div class="sidebar-info">
                 <strong>Session ID:</strong><br>
                 <code>{st.session_state.session_id[:8]}...</code><br><br>
-                <strong>Messages:</strong> {len(st.session_state.messages)}<br>
+                <strong>Messages:</strong> {len(st.session_state.roles)}<br>
                 <strong>Status:</strong> Active
             </div>
             """, unsafe_allow_html=True)
@@ -244,7 +329,7 @@ def sidebar():
         with col2:
             if st.button("🔄 New Session", use_container_width=True):
                 st.session_state.session_id = str(uuid.uuid4())
-                st.session_state.messages = []
+                reset_messages()
                 st.rerun()
         
         # Export History
@@ -286,7 +371,7 @@ def sidebar():
 def main():
     """Main application."""
     # Load CSS
-    load_css()
+    st.markdown(load_css(), unsafe_allow_html=True)
     
     # Initialize session
     initialize_session()
@@ -308,15 +393,10 @@ def main():
     
     # Display conversation history
     with chat_container:
-        if len(st.session_state.messages) == 0:
+        if len(st.session_state.roles) == 0:
             st.info("👋 Welcome! Start a conversation by typing a message below.")
         else:
-            for message in st.session_state.messages:
-                display_message(
-                    role=message['role'],
-                    content=message['content'],
-                    timestamp=message.get('timestamp', '')
-                )
+            display_messages(st.session_state.rendered)
     
     # Input area
     st.markdown("---")
@@ -337,11 +417,7 @@ def main():
     # Handle message sending
     if send_button and user_input:
         # Add user message to display
-        st.session_state.messages.append({
-            'role': 'user',
-            'content': user_input,
-            'timestamp': datetime.now().strftime("%H:%M:%S")
-        })
+        add_message('user', user_input, current_time())
         
         # Show loading spinner
         with st.spinner("🤔 Thinking..."):
@@ -350,11 +426,11 @@ def main():
             
             if response:
                 # Add assistant response
-                st.session_state.messages.append({
-                    'role': 'assistant',
-                    'content': response['response'],
-                    'timestamp': response.get('timestamp', datetime.now().strftime("%H:%M:%S"))
-                })
+                add_message(
+                    'assistant',
+                    response['response'],
+                    response.get('timestamp') or current_time()
+                )
         
         # Rerun to update UI
         st.rerun()
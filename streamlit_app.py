@@ -1,5 +1,11 @@
+import queue
+import time
+from concurrent.futures import Future
+from threading import Thread
+
 import streamlit as st
-from transformers import AutoTokenizer, AutoModelForCausalLM, pipeline
+from transformers import AutoTokenizer, AutoModelForCausalLM, TextIteratorStreamer, pipeline
+from transformers.generation.streamers import BaseStreamer
 import torch
 
 # Configuration de la page
@@ -49,8 +55,14 @@ def load_model_and_tokenizer():
     Charge le modèle depuis Hugging Face Hub
     """
     try:
-        # Streamlit Cloud utilise CPU uniquement
-        device = "cpu"
+        # Streamlit Cloud utilise CPU uniquement ; sur GPU les poids sont
+        # chargés en BF16/FP16 (moitié moins de mémoire et de bande passante)
+        if torch.cuda.is_available():
+            dtype = torch.bfloat16 if torch.cuda.is_bf16_supported() else torch.float16
+            model_kwargs = {'device_map': "auto", 'attn_implementation': "sdpa"}
+        else:
+            dtype = torch.float32
+            model_kwargs = {}
         
         # Chargement du tokenizer
         tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
@@ -59,21 +71,27 @@ def load_model_and_tokenizer():
         if tokenizer.pad_token is None:
             tokenizer.pad_token = tokenizer.eos_token
         
-        # Chargement du modèle (optimisé pour CPU)
+        # Padding à gauche pour générer des lots avec un modèle causal
+        tokenizer.padding_side = "left"
+        
+        # Chargement du modèle (device_map place déjà les poids sur GPU)
         model = AutoModelForCausalLM.from_pretrained(
             MODEL_NAME,
-            torch_dtype=torch.float32,
-            low_cpu_mem_usage=True
+            torch_dtype=dtype,
+            low_cpu_mem_usage=True,
+            **model_kwargs
         )
-        model.to(device)
+        
+        # Fusionner les adaptateurs LoRA une seule fois au chargement
+        if hasattr(model, 'merge_and_unload'):
+            model = model.merge_and_unload()
         model.eval()
         
-        # Création du pipeline
+        # Création du pipeline (le modèle est déjà placé)
         generator = pipeline(
             'text-generation',
             model=model,
-            tokenizer=tokenizer,
-            device=-1  # -1 pour CPU
+            tokenizer=tokenizer
         )
         
         return generator, tokenizer, None
@@ -81,6 +99,120 @@ def load_model_and_tokenizer():
     except Exception as e:
         return None, None, f"❌ Erreur lors du chargement: {str(e)}"
 
+# Regroupement des requêtes concurrentes (une session Streamlit = un thread)
+BATCH_WINDOW = 0.02  # secondes d'attente pour remplir un lot
+MAX_BATCH_SIZE = 8
+
+
+class BatchStreamer(BaseStreamer):
+    """
+    Répartit les tokens d'une génération par lot entre les streamers
+    de chaque requête (une ligne du lot par requête)
+    """
+    
+    def __init__(self, streamers):
+        self.streamers = streamers
+    
+    def put(self, value):
+        # Prompt [B, L] au premier appel, puis nouveaux tokens [B]
+        for i, streamer in enumerate(self.streamers):
+            streamer.put(value[i:i + 1])
+    
+    def end(self):
+        for streamer in self.streamers:
+            streamer.end()
+
+
+class GenerationBatcher:
+    """
+    Collecte les requêtes arrivant pendant BATCH_WINDOW et les génère
+    en un seul appel à model.generate (batch > 1) au lieu de les
+    sérialiser une par une sur le même modèle
+    """
+    
+    def __init__(self, model, tokenizer, window=BATCH_WINDOW, max_batch_size=MAX_BATCH_SIZE):
+        self.model = model
+        self.tokenizer = tokenizer
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self.requests = queue.Queue()
+        Thread(target=self._run, daemon=True).start()
+    
+    def submit(self, prompt, **params):
+        """
+        Ajoute une requête au prochain lot
+        
+        Returns:
+            (streamer du texte généré, future du nombre total de tokens)
+        """
+        streamer = TextIteratorStreamer(
+            self.tokenizer,
+            skip_prompt=True,
+            skip_special_tokens=True
+        )
+        future = Future()
+        self.requests.put((prompt, params, streamer, future))
+        return streamer, future
+    
+    def _collect(self):
+        batch = [self.requests.get()]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(self.requests.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return batch
+    
+    def _run(self):
+        while True:
+            # Seules les requêtes aux paramètres identiques partagent un lot
+            groups = {}
+            for request in self._collect():
+                groups.setdefault(tuple(sorted(request[1].items())), []).append(request)
+            for group in groups.values():
+                self._generate(group)
+    
+    def _generate(self, group):
+        streamer = BatchStreamer([request[2] for request in group])
+        try:
+            inputs = self.tokenizer(
+                [request[0] for request in group],
+                return_tensors="pt",
+                padding=True
+            ).to(self.model.device)
+            output_ids = self.model.generate(
+                **inputs,
+                streamer=streamer,
+                num_return_sequences=1,
+                pad_token_id=self.tokenizer.pad_token_id,
+                do_sample=True,
+                **group[0][1]
+            )
+        except Exception as e:
+            streamer.end()
+            for request in group:
+                request[3].set_exception(e)
+            return
+        
+        prompt_tokens = inputs['attention_mask'].sum(dim=1)
+        # tokens générés jusqu'au premier EOS inclus : pad_token_id == eos_token_id,
+        # seules les positions qui suivent ce premier EOS sont du remplissage
+        is_eos = output_ids[:, inputs['input_ids'].shape[1]:] == self.tokenizer.eos_token_id
+        after_eos = (is_eos.cumsum(dim=1) - is_eos.long()) > 0
+        new_tokens = (~after_eos).sum(dim=1)
+        for i, request in enumerate(group):
+            request[3].set_result(int(prompt_tokens[i] + new_tokens[i]))
+
+
+@st.cache_resource
+def get_batcher(_model, _tokenizer):
+    """Un seul batcher par processus, partagé par toutes les sessions"""
+    return GenerationBatcher(_model, _tokenizer)
+
 # Chargement du modèle avec barre de progression
 with st.spinner('🔄 Chargement du modèle... (première fois peut prendre 1-2 minutes)'):
     generator, tokenizer, error = load_model_and_tokenizer()
@@ -176,56 +308,61 @@ if generator and tokenizer:
         
         # Génération
         if generate_btn and prompt:
-            with st.spinner('✨ Génération en cours...'):
-                try:
-                    result = generator(
-                        prompt,
-                        max_new_tokens=max_new_tokens,
-                        num_return_sequences=1,
-                        pad_token_id=tokenizer.pad_token_id,
-                        temperature=temperature,
-                        top_k=top_k,
-                        top_p=top_p,
-                        do_sample=True,
-                        repetition_penalty=1.2
-                    )
-                    
-                    generated_text = result[0]['generated_text']
-                    
-                    st.success('✅ Génération terminée !')
-                    st.subheader('📄 Texte généré')
-                    st.markdown(f'<div class="generated-box">{generated_text}</div>', unsafe_allow_html=True)
-                    
-                    # Statistiques
-                    col_stat1, col_stat2, col_stat3 = st.columns(3)
-                    with col_stat1:
-                        st.metric("Caractères", len(generated_text))
-                    with col_stat2:
-                        st.metric("Mots", len(generated_text.split()))
-                    with col_stat3:
-                        st.metric("Tokens", len(tokenizer.encode(generated_text)))
-                    
-                    # Code copiable
-                    st.code(generated_text, language=None)
-                    
-                    # Sauvegarder dans l'historique
-                    if 'history' not in st.session_state:
-                        st.session_state.history = []
-                    st.session_state.history.append({
-                        'prompt': prompt,
-                        'result': generated_text,
-                        'params': {
-                            'max_tokens': max_new_tokens,
-                            'temperature': temperature,
-                            'top_k': top_k,
-                            'top_p': top_p
-                        }
-                    })
-                    
-                except Exception as e:
-                    st.error(f"❌ Erreur: {str(e)}")
-                    st.info("💡 Essayez de réduire le nombre de tokens ou de relancer")
-        
+            try:
+                # Seuls les nouveaux tokens sont décodés, au fur et à mesure ;
+                # les requêtes concurrentes sont générées dans un même lot
+                streamer, num_tokens = get_batcher(generator.model, tokenizer).submit(
+                    prompt,
+                    max_new_tokens=max_new_tokens,
+                    temperature=temperature,
+                    top_k=top_k,
+                    top_p=top_p,
+                    repetition_penalty=1.2
+                )
+                
+                st.subheader('📄 Texte généré')
+                output_box = st.empty()
+                new_text = ""
+                for piece in streamer:
+                    new_text += piece
+                    output_box.markdown(f'<div class="generated-box">{prompt}{new_text}</div>', unsafe_allow_html=True)
+                
+                # Relève l'éventuelle erreur de génération
+                total_tokens = num_tokens.result()
+                generated_text = prompt + new_text
+                
+                st.success('✅ Génération terminée !')
+                
+                # Statistiques
+                col_stat1, col_stat2, col_stat3 = st.columns(3)
+                with col_stat1:
+                    st.metric("Caractères", len(generated_text))
+                with col_stat2:
+                    st.metric("Mots", len(generated_text.split()))
+                with col_stat3:
+                    st.metric("Tokens", total_tokens)
+                
+                # Code copiable
+                st.code(generated_text, language=None)
+                
+                # Sauvegarder dans l'historique
+                if 'history' not in st.session_state:
+                    st.session_state.history = []
+                st.session_state.history.append({
+                    'prompt': prompt,
+                    'result': generated_text,
+                    'params': {
+                        'max_tokens': max_new_tokens,
+                        'temperature': temperature,
+                        'top_k': top_k,
+                        'top_p': top_p
+                    }
+                })
+                
+            except Exception as e:
+                st.error(f"❌ Erreur: {str(e)}")
+                st.info("💡 Essayez de réduire le nombre de tokens ou de relancer")
+    
         elif generate_btn:
             st.warning('⚠️ Veuillez entrer un prompt')
         
@@ -270,10 +407,14 @@ if generator and tokenizer:
         if 'history' in st.session_state and st.session_state.history:
             for idx, entry in enumerate(reversed(st.session_state.history)):
                 with st.expander(f"Génération #{len(st.session_state.history) - idx}"):
-                    st.write("**Prompt:**", entry['prompt'])
-                    st.write("**Résultat:**")
-                    st.write(entry['result'])
-                    st.json(entry['params'])
+                    # Un seul élément par entrée (au lieu de quatre) : moins de
+                    # messages envoyés au navigateur à chaque réexécution
+                    params = ", ".join(f"{k}={v}" for k, v in entry['params'].items())
+                    st.markdown(
+                        f"**Prompt:** {entry['prompt']}\n\n"
+                        f"**Résultat:**\n\n{entry['result']}\n\n"
+                        f"`{params}`"
+                    )
             
             if st.button("🗑️ Effacer l'historique"):
                 st.session_state.history = []
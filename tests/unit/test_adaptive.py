@@ -0,0 +1,323 @@
+"""
+Unit tests for ARSLM adaptive components.
+"""
+
+import io
+import pytest
+import torch
+import torch.nn as nn
+import sys
+from pathlib import Path
+
+# Add arslm/arslm/core to path
+sys.path.insert(
+    0, str(Path(__file__).parent.parent.parent / "arslm" / "arslm" / "core")
+)
+
+from adaptative import (
+    AdaptiveComputationTime,
+    AdaptiveLayer,
+    AdaptiveNormalization,
+    ContextGating,
+    DynamicRouter,
+)
+
+
+def legacy_experts(module, num_experts, hidden_size, inner_size):
+    """Build per-expert Sequentials matching the module's stacked weights."""
+    experts = nn.ModuleList([
+        nn.Sequential(
+            nn.Linear(hidden_size, inner_size),
+            nn.GELU(),
+            nn.Dropout(0.0),
+            nn.Linear(inner_size, hidden_size)
+        )
+        for _ in range(num_experts)
+    ])
+    with torch.no_grad():
+        for i, expert in enumerate(experts):
+            expert[0].weight.copy_(module.W1[i].t())
+            expert[0].bias.copy_(module.b1[i])
+            expert[3].weight.copy_(module.W2[i].t())
+            expert[3].bias.copy_(module.b2[i])
+    return experts
+
+
+class TestAdaptiveLayer:
+    """Test AdaptiveLayer."""
+
+    @pytest.fixture
+    def layer(self):
+        torch.manual_seed(0)
+        return AdaptiveLayer(hidden_size=16, num_experts=4).eval()
+
+    def test_output_shape(self, layer):
+        """Test output keeps input shape."""
+        x = torch.randn(2, 5, 16)
+        assert layer(x).shape == (2, 5, 16)
+
+    def test_matches_per_expert_loop(self, layer):
+        """Test grouped GEMM equals looping over independent experts."""
+        x = torch.randn(2, 5, 16)
+        experts = legacy_experts(layer, 4, 16, 32)
+
+        gate = torch.softmax(layer.gate(x.mean(dim=1)), dim=-1)
+        expected = sum(
+            expert(x) * gate[:, i].view(-1, 1, 1)
+            for i, expert in enumerate(experts)
+        )
+
+        assert torch.allclose(layer(x), expected, atol=1e-5)
+
+    def test_top1_routing_uses_best_expert(self, layer):
+        """Test top-1 routing equals running only the argmax expert."""
+        x = torch.randn(3, 5, 16)
+        experts = legacy_experts(layer, 4, 16, 32)
+        best = layer.gate(x.mean(dim=1)).argmax(dim=-1)
+
+        layer.top_k = 1
+        output = layer(x)
+
+        for b in range(3):
+            expected = experts[best[b]](x[b:b + 1])
+            assert torch.allclose(output[b:b + 1], expected, atol=1e-5)
+
+    def test_topk_all_experts_matches_dense(self, layer):
+        """Test sparse path with k=num_experts equals dense routing."""
+        x = torch.randn(2, 5, 16)
+        dense = layer(x)
+
+        layer.top_k = 4
+        assert torch.allclose(layer(x), dense)
+
+        layer.top_k = 3
+        assert layer(x).shape == dense.shape
+
+    def test_loads_legacy_state_dict(self, layer):
+        """Test checkpoints with per-expert modules still load."""
+        state = {k: v for k, v in layer.state_dict().items() if k.startswith('gate')}
+        for i, expert in enumerate(legacy_experts(layer, 4, 16, 32)):
+            for k, v in expert.state_dict().items():
+                state[f"experts.{i}.{k}"] = v
+
+        restored = AdaptiveLayer(hidden_size=16, num_experts=4).eval()
+        restored.load_state_dict(state)
+
+        x = torch.randn(2, 5, 16)
+        assert torch.allclose(restored(x), layer(x))
+
+    @pytest.mark.parametrize("top_k", [0, -1, 5])
+    def test_invalid_top_k(self, top_k):
+        """Test top_k outside [1, num_experts] is rejected at construction."""
+        with pytest.raises(ValueError, match="top_k"):
+            AdaptiveLayer(hidden_size=16, num_experts=4, top_k=top_k)
+
+
+class TestDynamicRouter:
+    """Test DynamicRouter."""
+
+    @pytest.mark.parametrize("top_k", [0, -1, 4])
+    def test_invalid_top_k(self, top_k):
+        """Test top_k outside [1, num_paths] is rejected at construction."""
+        with pytest.raises(ValueError, match="top_k"):
+            DynamicRouter(hidden_size=16, num_paths=3, top_k=top_k)
+
+    def test_routing_weights(self):
+        """Test routing weights are returned and normalized."""
+        router = DynamicRouter(hidden_size=16, num_paths=3).eval()
+        x = torch.randn(2, 5, 16)
+
+        output, weights = router(x, return_routing_weights=True)
+
+        assert output.shape == (2, 5, 16)
+        assert weights.shape == (2, 3)
+        assert torch.allclose(weights.sum(dim=-1), torch.ones(2))
+
+
+class TestQuantization:
+    """Test int8 inference quantization."""
+
+    @pytest.mark.parametrize("top_k", [None, 1])
+    def test_adaptive_layer_close_to_float(self, top_k):
+        """Test quantized experts stay close to FP32 output."""
+        torch.manual_seed(0)
+        layer = AdaptiveLayer(hidden_size=32, num_experts=4, top_k=top_k).eval()
+        x = torch.randn(2, 5, 32)
+        expected = layer(x)
+
+        layer.quantize_for_inference()
+
+        assert layer.quantized_experts is not None
+        assert torch.allclose(layer(x), expected, atol=5e-2)
+
+    def test_router_and_gating_close_to_float(self):
+        """Test quantized router and context gating outputs."""
+        torch.manual_seed(0)
+        router = DynamicRouter(hidden_size=32).eval()
+        gating = ContextGating(hidden_size=32).eval()
+        x = torch.randn(2, 5, 32)
+        expected_router = router(x)
+        expected_gating = gating(x, x)
+
+        router.quantize_for_inference()
+        gating.quantize_for_inference()
+
+        assert torch.allclose(router(x), expected_router, atol=5e-2)
+        assert torch.allclose(gating(x, x), expected_gating, atol=5e-2)
+
+    @pytest.mark.parametrize("module_cls", [AdaptiveLayer, DynamicRouter])
+    def test_fp32_experts_released(self, module_cls):
+        """Test quantization drops the stacked FP32 weights and shrinks checkpoints."""
+        def checkpoint_bytes(module):
+            buffer = io.BytesIO()
+            torch.save(module.state_dict(), buffer)
+            return buffer.tell()
+
+        module = module_cls(hidden_size=64).eval()
+        fp32_bytes = checkpoint_bytes(module)
+        module.quantize_for_inference()
+        names = {name for name, _ in module.named_parameters()}
+
+        assert not names & {'W1', 'b1', 'W2', 'b2'}
+        assert checkpoint_bytes(module) < fp32_bytes / 2
+
+        reloaded = module_cls(hidden_size=64).quantize_for_inference()
+        reloaded.load_state_dict(module.state_dict())
+        x = torch.randn(2, 5, 64)
+        assert torch.allclose(reloaded(x), module(x))
+
+
+class TestAdaptiveNormalization:
+    """Test AdaptiveNormalization."""
+
+    def test_matches_reference(self):
+        """Test fused statistics match the composed formulation."""
+        norm = AdaptiveNormalization(hidden_size=16)
+        x = torch.randn(2, 5, 16) * 3 + 1
+
+        layer_norm = (x - x.mean(-1, keepdim=True)) / torch.sqrt(
+            x.var(-1, keepdim=True, unbiased=False) + norm.eps
+        )
+        batch_norm = (x - x.mean((0, 1), keepdim=True)) / torch.sqrt(
+            x.var((0, 1), keepdim=True, unbiased=False) + norm.eps
+        )
+        gate = norm.gate_network(x.mean(dim=1)).unsqueeze(1)
+        expected = gate * layer_norm + (1 - gate) * batch_norm
+
+        assert torch.allclose(norm(x), expected, atol=1e-5)
+        assert torch.allclose(norm.eval()(x), expected, atol=1e-5)
+
+    def test_single_position(self):
+        """Test a [1, 1, H] input (one-token, batch-1 decoding) is supported."""
+        norm = AdaptiveNormalization(hidden_size=16)
+        x = torch.randn(1, 1, 16)
+        
+        gate = norm.gate_network(x.mean(dim=1)).unsqueeze(1)
+        layer_norm = torch.nn.functional.layer_norm(x, (16,), eps=norm.eps)
+        expected = gate * layer_norm
+        
+        assert torch.allclose(norm(x), expected, atol=1e-5)
+        assert torch.allclose(norm.eval()(x), expected, atol=1e-5)
+        
+        tracked = AdaptiveNormalization(hidden_size=16, track_running_stats=True)
+        assert tracked(x).shape == x.shape
+        assert tracked.eval()(x).shape == x.shape
+    
+    def test_running_stats(self):
+        """Test running statistics are tracked and used in eval mode."""
+        norm = AdaptiveNormalization(hidden_size=16, track_running_stats=True)
+        x = torch.randn(4, 5, 16) * 3 + 1
+
+        norm(x)
+        flat = x.reshape(-1, 16)
+        assert torch.allclose(norm.running_mean, 0.1 * flat.mean(0), atol=1e-5)
+
+        norm.eval()
+        reference = torch.nn.BatchNorm1d(16, affine=False).eval()
+        reference.running_mean.copy_(norm.running_mean)
+        reference.running_var.copy_(norm.running_var)
+        gate = norm.gate_network(x.mean(dim=1)).unsqueeze(1)
+        layer_norm = torch.nn.functional.layer_norm(x, (16,), eps=norm.eps)
+        expected = gate * layer_norm + (1 - gate) * reference(flat).view_as(x)
+
+        assert torch.allclose(norm(x), expected, atol=1e-5)
+
+
+class TestAdaptiveComputationTime:
+    """Test AdaptiveComputationTime."""
+
+    @staticmethod
+    def reference(act, x):
+        """Dense ACT loop where halted tokens stop contributing."""
+        state = x
+        halting_prob = torch.zeros(*x.shape[:2], 1)
+        n_updates = torch.zeros_like(halting_prob)
+        accumulated = torch.zeros_like(x)
+        for _ in range(act.max_steps):
+            processed = act.processor(state)
+            p = act.halting_predictor(processed)
+            running = (halting_prob < act.threshold).float()
+            new_prob = halting_prob + p * running
+            weights = torch.where(
+                new_prob > act.threshold, 1.0 - halting_prob, p
+            ) * running
+            accumulated = accumulated + processed * weights
+            halting_prob = new_prob
+            n_updates = n_updates + running
+            state = processed
+        return accumulated, n_updates.mean()
+
+    def test_matches_dense_reference(self):
+        """Test skipping halted tokens does not change the result."""
+        torch.manual_seed(0)
+        act = AdaptiveComputationTime(hidden_size=16, max_steps=6).eval()
+        x = torch.randn(2, 8, 16)
+
+        # Make most tokens halt after a couple of steps
+        with torch.no_grad():
+            act.halting_predictor[0].weight.normal_(std=2.0)
+
+        output, ponder = act(x)
+        expected, expected_ponder = self.reference(act, x)
+
+        assert torch.allclose(output, expected, atol=1e-5)
+        assert torch.isclose(ponder, expected_ponder)
+
+    def test_unrolled_matches_loop(self):
+        """Test cumulative-sum halting equals the iterative loop."""
+        torch.manual_seed(0)
+        act = AdaptiveComputationTime(hidden_size=16, max_steps=6).eval()
+        x = torch.randn(2, 8, 16)
+        with torch.no_grad():
+            act.halting_predictor[0].weight.normal_(std=2.0)
+
+        expected, expected_ponder = act(x)
+        act.unroll = True
+        output, ponder = act(x)
+
+        assert torch.allclose(output, expected, atol=1e-5)
+        assert torch.isclose(ponder, expected_ponder)
+
+
+class TestContextGating:
+    """Test ContextGating."""
+
+    def test_loads_legacy_state_dict(self):
+        """Test concat-MLP checkpoints load and give the same output."""
+        torch.manual_seed(0)
+        legacy = nn.Sequential(
+            nn.Linear(16 + 8, 16),
+            nn.Tanh(),
+            nn.Linear(16, 16),
+            nn.Sigmoid()
+        )
+        state = {f"gate.{k}": v for k, v in legacy.state_dict().items()}
+
+        gating = ContextGating(hidden_size=16, context_size=8).eval()
+        gating.load_state_dict(state)
+
+        h = torch.randn(2, 5, 16)
+        c = torch.randn(2, 5, 8)
+        expected = h * legacy(torch.cat([h, c], dim=-1))
+
+        assert torch.allclose(gating(h, c), expected, atol=1e-6)
@@ -0,0 +1,171 @@
+"""
+Unit tests for the ARSLM notebook fixes (arslm_fixes.py).
+"""
+
+import copy
+import pickle
+
+import pytest
+import torch
+
+pytest.importorskip("transformers")
+
+import arslm_fixes
+
+
+class StubHFTokenizer:
+    """Whitespace tokenizer standing in for the Hugging Face one."""
+
+    VOCAB = {"[PAD]": 0, "[UNK]": 1, "[CLS]": 2, "[SEP]": 3, "hello": 4, "world": 5}
+    pad_token_id = 0
+    unk_token_id = 1
+    cls_token_id = 2
+    sep_token_id = 3
+
+    @classmethod
+    def from_pretrained(cls, pretrained_name, use_fast=True):
+        return cls()
+
+    def get_vocab(self):
+        return dict(self.VOCAB)
+
+    def encode(self, text, add_special_tokens=False):
+        self.calls = getattr(self, "calls", 0) + 1
+        return [self.VOCAB.get(word, self.unk_token_id) for word in text.split()]
+
+    def decode(self, ids, skip_special_tokens=True):
+        words = {token_id: word for word, token_id in self.VOCAB.items()}
+        return " ".join(words[i] for i in ids if not (skip_special_tokens and i < 4))
+
+
+@pytest.fixture
+def tokenizer(monkeypatch):
+    monkeypatch.setattr(arslm_fixes, "HFTokenizer", StubHFTokenizer)
+    return arslm_fixes.AdvancedTokenizer(cache_size=2)
+
+
+class TestAdvancedTokenizer:
+    """Test AdvancedTokenizer."""
+
+    def test_encode_cache(self, tokenizer):
+        """Test repeated texts hit the LRU and callers get fresh lists."""
+        ids = tokenizer.encode("hello world")
+        ids.append(99)
+
+        assert tokenizer.encode("hello world") == [4, 5]
+        assert tokenizer.tokenizer.calls == 1
+
+        tokenizer.encode("world")
+        tokenizer.encode("hello")
+        assert list(tokenizer._encode_cache) == ["world", "hello"]
+
+    def test_pickle_and_deepcopy(self, tokenizer):
+        """Test the cached tokenizer can be pickled and copied."""
+        tokenizer.encode("hello world")
+
+        restored = pickle.loads(pickle.dumps(tokenizer))
+        assert restored.encode("hello world") == [4, 5]
+
+        copied = copy.deepcopy(tokenizer)
+        copied.encode("world")
+        assert "world" not in tokenizer._encode_cache
+
+
+@pytest.fixture
+def model(tokenizer):
+    torch.manual_seed(0)
+    return arslm_fixes.ARSLM(tokenizer, emb_dim=8, hidden_dim=16).eval()
+
+
+class TestForward:
+    """Test ARSLM.forward."""
+
+    def test_empty_sequence(self, model):
+        """Test a zero-length input returns empty logits and keeps the past."""
+        logits, gates = model(torch.zeros(2, 0, dtype=torch.long))
+
+        assert logits.shape == (2, 0, model.vocab_size)
+        assert gates.shape == (2, 0)
+
+        _, _, past = model(torch.tensor([[2, 4]]), use_cache=True)
+        logits, _, new_past = model(torch.zeros(1, 0, dtype=torch.long), past=past, use_cache=True)
+        assert logits.shape == (1, 0, model.vocab_size)
+        assert new_past[-1] == past[-1] == 2
+
+    @torch.no_grad()
+    def test_incremental_matches_full_sequence(self, model):
+        """Test decoding with past gives the full-sequence logits."""
+        input_ids = torch.tensor([[2, 4, 5, 1, 4], [2, 5, 5, 4, 1]])
+        expected, expected_gates = model(input_ids)
+
+        logits, gates, past = model(input_ids[:, :2], use_cache=True)
+        steps, step_gates = [logits], [gates]
+        for t in range(2, input_ids.size(1)):
+            logits, gates, past = model(input_ids[:, t:t + 1], past=past, use_cache=True)
+            steps.append(logits)
+            step_gates.append(gates)
+
+        assert torch.allclose(torch.cat(steps, dim=1), expected, atol=1e-5)
+        assert torch.allclose(torch.cat(step_gates, dim=1), expected_gates, atol=1e-5)
+
+    @torch.no_grad()
+    def test_only_last_matches_last_position(self, model):
+        """Test only_last returns the last position of the full output."""
+        input_ids = torch.tensor([[2, 4, 5, 1], [2, 5, 4, 4]])
+        expected, expected_gates = model(input_ids)
+
+        logits, gates = model(input_ids, only_last=True)
+        assert logits.shape == (2, 1, model.vocab_size)
+        assert torch.allclose(logits, expected[:, -1:], atol=1e-5)
+        assert torch.allclose(gates, expected_gates[:, -1:], atol=1e-5)
+
+        _, _, past = model(input_ids[:, :2], use_cache=True)
+        logits, _, _ = model(input_ids[:, 2:], past=past, use_cache=True, only_last=True)
+        assert torch.allclose(logits, expected[:, -1:], atol=1e-5)
+
+
+class TestPromptCache:
+    """Test the ARSLM prompt embedding cache."""
+
+    def test_embed_prompt_cache(self, tokenizer):
+        """Test repeated prompts hit the LRU until the weights change."""
+        model = arslm_fixes.ARSLM(tokenizer, emb_dim=8, hidden_dim=16, prompt_cache_size=2)
+        idx, emb = model.embed_prompt("hello world")
+        assert model.embed_prompt("hello world")[1] is emb
+
+        with torch.no_grad():
+            model.emb.weight.add_(1.0)
+        assert torch.allclose(model.embed_prompt("hello world")[1], model.emb(idx))
+
+        model.embed_prompt("world")
+        assert len(model._prompt_cache) == 2
+
+    def test_pickle_and_deepcopy(self, tokenizer):
+        """Test a model with cached prompts can be pickled and copied."""
+        model = arslm_fixes.ARSLM(tokenizer, emb_dim=8, hidden_dim=16)
+        model.eval()
+        idx, _ = model.embed_prompt("hello world")
+
+        restored = pickle.loads(pickle.dumps(model))
+        assert len(restored._prompt_cache) == 0
+        assert isinstance(restored.generate_text("hello", max_new_tokens=2), str)
+
+        copied = copy.deepcopy(model)
+        with torch.no_grad():
+            copied.emb.weight.mul_(2.0)
+        assert torch.allclose(copied.embed_prompt("hello world")[1], copied.emb(idx))
+        assert not torch.allclose(copied.embed_prompt("hello world")[1], model.emb(idx))
+
+
+class TestEnableBF16:
+    """Test ARSLM.enable_bf16."""
+
+    def test_requires_native_bf16(self, tokenizer, monkeypatch):
+        """Test autocast stays off without native BF16 unless forced."""
+        model = arslm_fixes.ARSLM(tokenizer, emb_dim=8, hidden_dim=16)
+        monkeypatch.setattr(arslm_fixes, "_cpu_has_native_bf16", lambda: False)
+        assert not model.enable_bf16()
+        assert model.enable_bf16(force=True)
+
+        monkeypatch.setattr(arslm_fixes, "_cpu_has_native_bf16", lambda: True)
+        assert model.enable_bf16()
@@ -0,0 +1,53 @@
+"""
+Unit tests for the Streamlit ARSLM wrapper (arslm/arslm.py).
+"""
+
+import importlib
+import sys
+import types
+
+import pytest
+
+numba = pytest.importorskip("numba")
+
+
+def token_loop(values):
+    total = 0.0
+    for value in values:
+        total += value
+    return total
+
+
+class StubEngine:
+    """Engine exposing a scalar token loop."""
+
+    def __init__(self, dataset_path=None):
+        self.token_loop = token_loop
+
+
+@pytest.fixture
+def wrapper(monkeypatch):
+    engine_module = types.ModuleType("arslm.core.engine")
+    engine_module.ARSLMEngine = StubEngine
+    monkeypatch.setitem(sys.modules, "arslm.core.engine", engine_module)
+    monkeypatch.delitem(sys.modules, "arslm.arslm", raising=False)
+    module = importlib.import_module("arslm.arslm")
+    monkeypatch.setattr(module, "_ENGINE_CACHE", {})
+    yield module
+    sys.modules.pop("arslm.arslm", None)
+
+
+class TestEnableJit:
+    """Test ARSLM.enable_jit."""
+
+    def test_shared_engine_compiled_once(self, wrapper):
+        """Test a second jit instance reuses the already compiled loop."""
+        first = wrapper.ARSLM(jit=True)
+        compiled = first.engine.token_loop
+        assert isinstance(compiled, numba.core.dispatcher.Dispatcher)
+
+        second = wrapper.ARSLM(jit=True)
+        assert second.jit_enabled
+        assert second.engine is first.engine
+        assert second.engine.token_loop is compiled
+        assert second.enable_jit()
@@ -0,0 +1,368 @@
+"""
+Unit tests for ARSLM API client.
+"""
+
+import asyncio
+
+import pytest
+import requests
+
+from arslm.api.cache import (
+    DiskCache,
+    ResponseCache,
+    SemanticCache,
+    make_cache_key,
+)
+from arslm.api.client import ARSLMClient, AsyncARSLMClient
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """Client whose HTTP layer records calls instead of sending them."""
+    client = ARSLMClient("http://localhost:8000")
+    calls = []
+
+    def fake_request(method, endpoint, **kwargs):
+        calls.append((method, endpoint, kwargs))
+        return {'text': f"response {len(calls)}"}
+
+    monkeypatch.setattr(client, '_request', fake_request)
+    client.calls = calls
+    return client
+
+
+class TestResponseCache:
+    """Test ResponseCache."""
+
+    def test_put_get(self):
+        """Test storing and retrieving a response."""
+        cache = ResponseCache(maxsize=2)
+        cache.put("a", {'text': "hello"})
+
+        assert cache.get("a") == {'text': "hello"}
+        assert cache.get("b") is None
+        assert cache.stats() == {'hits': 1, 'misses': 1, 'size': 1}
+
+    def test_lru_eviction(self):
+        """Test least recently used entry is evicted first."""
+        cache = ResponseCache(maxsize=2)
+        cache.put("a", {'text': "a"})
+        cache.put("b", {'text': "b"})
+        cache.get("a")
+        cache.put("c", {'text': "c"})
+
+        assert cache.get("a") is not None
+        assert cache.get("b") is None
+        assert len(cache) == 2
+
+    def test_ttl_expiry(self):
+        """Test expired entries are not returned."""
+        cache = ResponseCache(ttl=-1)
+        cache.put("a", {'text': "a"})
+
+        assert cache.get("a") is None
+
+    def test_key_is_order_independent(self):
+        """Test cache key ignores payload key order."""
+        key1 = make_cache_key("/chat", {'a': 1, 'b': 2})
+        key2 = make_cache_key("/chat", {'b': 2, 'a': 1})
+
+        assert key1 == key2
+        assert key1 != make_cache_key("/generate", {'a': 1, 'b': 2})
+
+
+class TestDiskCache:
+    """Test DiskCache."""
+
+    def test_survives_reopen(self, tmp_path):
+        """Test entries are readable from a new cache on the same file."""
+        path = tmp_path / "cache.db"
+        DiskCache(path).put("a", {'text': "hello " * 500})
+
+        cache = DiskCache(path)
+        assert cache.get("a") == {'text': "hello " * 500}
+        assert cache.get("b") is None
+        assert cache.stats() == {'hits': 1, 'misses': 1, 'size': 1}
+
+    def test_eviction_and_ttl(self, tmp_path):
+        """Test oldest entries are evicted and expired ones not returned."""
+        cache = DiskCache(tmp_path / "cache.db", maxsize=2)
+        for key in "abc":
+            cache.put(key, {'text': key})
+
+        assert len(cache) == 2
+        assert cache.get("a") is None
+
+        expired = DiskCache(tmp_path / "expired.db", ttl=-1)
+        expired.put("a", {'text': "a"})
+        assert expired.get("a") is None
+
+    def test_client_cache_path(self, tmp_path):
+        """Test cache_path backs the client exact-match cache."""
+        client = ARSLMClient(cache_path=str(tmp_path / "cache.db"))
+
+        assert isinstance(client._cache, DiskCache)
+
+
+class TestSemanticCache:
+    """Test SemanticCache."""
+
+    def test_similar_embedding_hits(self):
+        """Test lookup returns the response of a close embedding."""
+        cache = SemanticCache(maxsize=4)
+        cache.put([1.0, 0.0, 0.0], {'text': "x"})
+        cache.put([0.0, 1.0, 0.0], {'text': "y"})
+
+        assert cache.get([0.99, 0.05, 0.0], threshold=0.9) == {'text': "x"}
+        assert cache.get([0.0, 0.0, 1.0], threshold=0.9) is None
+
+    def test_ring_buffer_eviction(self):
+        """Test oldest entry is overwritten when full."""
+        cache = SemanticCache(maxsize=1)
+        cache.put([1.0, 0.0], {'text': "old"})
+        cache.put([0.0, 1.0], {'text': "new"})
+
+        assert len(cache) == 1
+        assert cache.get([1.0, 0.0], threshold=0.9) is None
+
+    def test_scope_must_match(self):
+        """Test entries are only returned for the scope they were stored in."""
+        cache = SemanticCache(maxsize=4)
+        cache.put([1.0, 0.0], {'text': "s1"}, scope="s1")
+        cache.put([0.9, 0.1], {'text': "s2"}, scope="s2")
+
+        assert cache.get([1.0, 0.0], threshold=0.9, scope="s2") == {'text': "s2"}
+        assert cache.get([1.0, 0.0], threshold=0.9, scope="s3") is None
+        assert cache.get([1.0, 0.0], threshold=0.9) is None
+
+
+class TestClientCache:
+    """Test exact-match caching in ARSLMClient."""
+
+    def test_deterministic_chat_is_cached(self, client):
+        """Test identical deterministic requests hit the cache."""
+        first = client.chat("Hello", session_id="s1", temperature=0)
+        second = client.chat("Hello", session_id="s1", temperature=0)
+
+        assert first == second
+        assert len(client.calls) == 1
+        assert client.cache_stats()['hits'] == 1
+
+    def test_sampled_chat_is_not_cached(self, client):
+        """Test requests with temperature > 0 always reach the API."""
+        client.chat("Hello", session_id="s1", temperature=0.7)
+        client.chat("Hello", session_id="s1", temperature=0.7)
+
+        assert len(client.calls) == 2
+
+    def test_cache_modes(self, client):
+        """Test readOnly does not populate and None bypasses the cache."""
+        client.generate("Hi", temperature=0, cache='readOnly')
+        client.generate("Hi", temperature=0, cache='readOnly')
+        assert len(client.calls) == 2
+
+        client.generate("Hi", temperature=0, cache='writeOnly')
+        client.generate("Hi", temperature=0, cache=None)
+        client.generate("Hi", temperature=0)
+        assert len(client.calls) == 4
+
+    def test_invalid_cache_mode(self, client):
+        """Test unknown cache mode raises ValueError."""
+        with pytest.raises(ValueError):
+            client.chat("Hello", session_id="s1", temperature=0, cache='always')
+
+    def test_clear_cache(self, client):
+        """Test clearing the cache forces a new request."""
+        client.chat("Hello", session_id="s1", temperature=0)
+        client.clear_cache()
+        client.chat("Hello", session_id="s1", temperature=0)
+
+        assert len(client.calls) == 2
+
+    @pytest.fixture
+    def semantic(self, monkeypatch):
+        embeddings = {
+            "what is arslm": [1.0, 0.0],
+            "what's arslm?": [0.98, 0.1],
+            "delete my data": [1.0, 0.0],
+        }
+        client = ARSLMClient(embed_fn=embeddings.__getitem__)
+        calls = []
+        monkeypatch.setattr(
+            client,
+            '_request',
+            lambda *args, **kwargs: calls.append(args) or {'text': "answer"}
+        )
+        client.calls = calls
+        return client
+
+    def test_semantic_cache_for_paraphrases(self, semantic):
+        """Test paraphrased chat messages reuse the cached answer."""
+        semantic.chat("what is arslm", session_id="s1", temperature=0)
+        semantic.chat("what's arslm?", session_id="s1", temperature=0)
+        assert len(semantic.calls) == 1
+
+        # Command-like prompts bypass the semantic cache
+        semantic.chat("delete my data", session_id="s1", temperature=0)
+        assert len(semantic.calls) == 2
+
+    def test_semantic_cache_is_scoped(self, semantic):
+        """Test paraphrases only hit for the same session and options."""
+        semantic.chat("what is arslm", session_id="s1", temperature=0)
+        semantic.chat("what's arslm?", session_id="s2", temperature=0)
+        semantic.chat("what's arslm?", session_id="s1", temperature=0, max_length=10)
+        assert len(semantic.calls) == 3
+
+    def test_sampled_chat_skips_semantic_cache(self, semantic):
+        """Test sampled answers are neither stored nor served."""
+        semantic.chat("what is arslm", session_id="s1")
+        semantic.chat("what's arslm?", session_id="s1")
+        assert len(semantic.calls) == 2
+        assert len(semantic._semantic_cache) == 0
+
+
+class TestPreparedRequests:
+    """Test reuse of prepared requests in ARSLMClient."""
+
+    def test_template_is_reused(self):
+        """Test fixed endpoints share one template but get fresh copies."""
+        client = ARSLMClient("http://localhost:8000/", api_key="key")
+
+        first = client._prepare('POST', '/api/v1/chat')
+        first.prepare_body(b'{"a":1}', None)
+        second = client._prepare('POST', '/api/v1/chat')
+
+        assert first.url == "http://localhost:8000/api/v1/chat"
+        assert second.headers['Authorization'] == "Bearer key"
+        assert second.body is None
+        assert list(client._prepared) == [('POST', '/api/v1/chat')]
+
+    def test_dynamic_endpoint_not_cached(self):
+        """Test per-session paths do not grow the template cache."""
+        client = ARSLMClient("http://localhost:8000")
+        client._prepare('DELETE', '/api/v1/history/s1')
+
+        assert client._prepared == {}
+
+    def test_environment_settings_applied(self, monkeypatch):
+        """Test proxy variables reach send() and are merged once."""
+        monkeypatch.setenv('HTTP_PROXY', "http://proxy:3128")
+        monkeypatch.delenv('NO_PROXY', raising=False)
+        monkeypatch.delenv('no_proxy', raising=False)
+        client = ARSLMClient("http://example.com")
+        sent = []
+
+        def fake_send(prepared, **kwargs):
+            sent.append(kwargs)
+            return requests.Response()
+
+        monkeypatch.setattr(client.session, 'send', fake_send)
+        monkeypatch.setattr(requests.Response, 'raise_for_status', lambda self: None)
+        client._send('GET', '/health')
+        client._send('GET', '/health')
+
+        assert sent[0]['proxies']['http'] == "http://proxy:3128"
+        assert sent[0]['stream'] is False
+        assert list(client._send_settings) == [('/health', False)]
+
+
+class TestClientStream:
+    """Test streaming chat/generate in ARSLMClient."""
+
+    @pytest.fixture
+    def streaming(self, monkeypatch):
+        client = ARSLMClient("http://localhost:8000")
+        calls = []
+
+        def fake_stream(endpoint, payload):
+            calls.append((endpoint, payload))
+            for word in ("Hello", " world"):
+                yield {'text': word}
+
+        monkeypatch.setattr(client, '_stream_request', fake_stream)
+        client.calls = calls
+        return client
+
+    def test_chunks_are_yielded(self, streaming):
+        """Test chunks are passed through with stream flag set."""
+        chunks = list(streaming.chat_stream("Hi", session_id="s1"))
+
+        assert [c['text'] for c in chunks] == ["Hello", " world"]
+        assert streaming.calls[0][1]['stream'] is True
+
+    def test_deterministic_stream_is_replayed(self, streaming):
+        """Test a fully consumed deterministic stream is cached."""
+        first = list(streaming.generate_stream("Hi", temperature=0))
+        second = list(streaming.generate_stream("Hi", temperature=0))
+
+        assert first == second
+        assert len(streaming.calls) == 1
+
+    def test_invalid_cache_mode_raises_eagerly(self, streaming):
+        """Test cache mode is validated before iteration starts."""
+        with pytest.raises(ValueError):
+            streaming.chat_stream("Hi", session_id="s1", cache='always')
+
+
+class TestHTTPXClient:
+    """Test ARSLMClientHTTPX."""
+
+    def test_chat_and_cache(self):
+        """Test requests go through httpx and share the client caches."""
+        httpx = pytest.importorskip("httpx")
+        from arslm.api.client import ARSLMClientHTTPX
+
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(200, json={'text': "hi"})
+
+        client = ARSLMClientHTTPX("http://localhost:8000", api_key="key")
+        client.client = httpx.Client(
+            base_url=client.base_url,
+            headers=client.client.headers,
+            transport=httpx.MockTransport(handler)
+        )
+
+        client.chat("Hello", session_id="s1", temperature=0)
+        assert client.chat("Hello", session_id="s1", temperature=0) == {
+            'text': "hi"
+        }
+        assert len(calls) == 1
+        assert str(calls[0].url) == "http://localhost:8000/api/v1/chat"
+        assert calls[0].headers['Authorization'] == "Bearer key"
+
+
+@pytest.mark.skipif(AsyncARSLMClient is None, reason="aiohttp not installed")
+class TestAsyncClientStream:
+    """Test streaming in AsyncARSLMClient."""
+
+    def test_stream_outlives_request_timeout(self):
+        """Test a stream longer than timeout is not cut off between chunks."""
+        from aiohttp import web
+
+        async def slow_stream(request):
+            response = web.StreamResponse()
+            await response.prepare(request)
+            for word in ("Hello", " world", "!"):
+                await asyncio.sleep(0.1)
+                await response.write(b'{"text": "%s"}\n' % word.encode())
+            await response.write_eof()
+            return response
+
+        async def run():
+            app = web.Application()
+            app.router.add_post('/api/v1/generate', slow_stream)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, '127.0.0.1', 0)
+            await site.start()
+            port = runner.addresses[0][1]
+            try:
+                async with AsyncARSLMClient(f"http://127.0.0.1:{port}", timeout=0.25) as client:
+                    return [chunk['text'] async for chunk in client.generate_stream("Hi")]
+            finally:
+                await runner.cleanup()
+
+        assert asyncio.run(run()) == ["Hello", " world", "!"]
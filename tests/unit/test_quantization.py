@@ -0,0 +1,45 @@
+"""
+Unit tests for ARSLMModel int8 inference quantization.
+"""
+
+import pytest
+import torch
+import torch.nn as nn
+
+from src.arslm.model import ARSLMConfig, ARSLMModel
+
+
+@pytest.fixture
+def model():
+    torch.manual_seed(0)
+    config = ARSLMConfig(vocab_size=1000, d_model=128, n_layers=2)
+    return ARSLMModel(config).eval()
+
+
+class TestQuantizeForInference:
+    """Test ARSLMModel.quantize_for_inference."""
+
+    def test_modules_quantized(self, model):
+        """Test every Linear and the token embedding are swapped for int8."""
+        assert model.quantize_for_inference() is model
+
+        assert not any(type(module) is nn.Linear for module in model.modules())
+        assert isinstance(model.output_projection, torch.ao.nn.quantized.dynamic.Linear)
+        assert isinstance(model.token_embedding, torch.ao.nn.quantized.Embedding)
+        # LayerNorm and the position embedding stay in FP32
+        assert type(model.position_embedding) is nn.Embedding
+
+    def test_close_to_fp32(self, model):
+        """Test int8 head and embedding stay close to FP32."""
+        input_ids = torch.randint(0, 1000, (2, 10))
+        hidden = torch.randn(2, 10, 128)
+
+        with torch.no_grad():
+            expected_embeds = model.token_embedding(input_ids)
+            expected_logits = model.output_projection(hidden)
+            model.quantize_for_inference()
+            embeds = model.token_embedding(input_ids)
+            logits = model.output_projection(hidden)
+
+        assert torch.allclose(embeds, expected_embeds, atol=1e-3)
+        assert torch.allclose(logits, expected_logits, atol=5e-2)
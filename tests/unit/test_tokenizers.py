@@ -0,0 +1,224 @@
+"""
+Unit tests for ARSLM tokenizer.
+"""
+
+import pytest
+import torch
+
+from arslm.utils.tokenizers import ARSLMTokenizer
+
+
+@pytest.fixture
+def tokenizer():
+    """Word tokenizer with a small vocabulary."""
+    tokenizer = ARSLMTokenizer(max_length=8)
+    tokenizer.build_vocab(
+        ["hello world, hello ARSLM!", "the world is big"],
+        min_frequency=1
+    )
+    return tokenizer
+
+
+TEXTS = [
+    "Hello world",
+    "the world is big, hello hello world ARSLM!",
+    "",
+    "unknown words here",
+]
+
+
+class TestTokenize:
+    """Test ARSLMTokenizer.tokenize."""
+
+    def test_word_tokens(self, tokenizer):
+        """Test words and punctuation are split and lowercased."""
+        assert tokenizer.tokenize("  Café naïve — ça va? 123_abc ") == [
+            "café", "naïve", "—", "ça", "va", "?", "123_abc"
+        ]
+
+
+class TestConvertTokensToIds:
+    """Test ARSLMTokenizer.convert_tokens_to_ids."""
+
+    def test_known_and_unknown(self, tokenizer):
+        """Test known tokens map to their IDs and others to [UNK]."""
+        ids = tokenizer.convert_tokens_to_ids(["hello", "nope", "world"])
+
+        assert ids == [
+            tokenizer.vocab["hello"],
+            tokenizer.unk_token_id,
+            tokenizer.vocab["world"],
+        ]
+
+
+class TestBuildVocab:
+    """Test ARSLMTokenizer.build_vocab."""
+
+    def test_parallel_matches_serial(self):
+        """Test counting in worker processes gives the same vocabulary."""
+        texts = ["the cat sat", "the dog sat down", "a cat, a dog!"] * 10
+
+        serial = ARSLMTokenizer()
+        serial.build_vocab(texts, min_frequency=1, num_workers=1)
+        parallel = ARSLMTokenizer()
+        parallel.build_vocab(texts, min_frequency=1, num_workers=2)
+
+        assert parallel.vocab == serial.vocab
+
+    def test_large_corpus_stays_in_process(self, monkeypatch):
+        """Test no process pool is started unless num_workers asks for one."""
+        def no_pool(*args, **kwargs):
+            raise AssertionError("process pool started")
+
+        monkeypatch.setattr("arslm.utils.tokenizers.multiprocessing.Pool", no_pool)
+        tokenizer = ARSLMTokenizer()
+        tokenizer.build_vocab(["the cat sat"] * 100_000, min_frequency=1)
+
+        assert "cat" in tokenizer.vocab
+
+    def test_min_frequency_and_size(self):
+        """Test rare tokens are dropped and vocab_size is respected."""
+        tokenizer = ARSLMTokenizer()
+        tokenizer.build_vocab(["a a a b b c"], vocab_size=7, min_frequency=2)
+
+        assert list(tokenizer.vocab)[5:] == ["a", "b"]
+
+        tokenizer.build_vocab(["a a a b b c"], vocab_size=6, min_frequency=1)
+        assert list(tokenizer.vocab)[5:] == ["a"]
+
+
+class TestSaveLoad:
+    """Test ARSLMTokenizer.save and load."""
+
+    def test_round_trip(self, tokenizer, tmp_path):
+        """Test a saved tokenizer loads with the same vocabulary."""
+        tokenizer.build_vocab(["café naïve ça"], min_frequency=1)
+        path = tmp_path / "tokenizer" / "vocab.json"
+        tokenizer.save(path)
+
+        loaded = ARSLMTokenizer.load(path)
+
+        assert loaded.vocab == tokenizer.vocab
+        assert loaded.max_length == tokenizer.max_length
+        assert loaded.encode("ça va") == tokenizer.encode("ça va")
+
+
+class TestTokenizerCache:
+    """Test encode and prefix caches."""
+
+    def test_prefix_cache_matches_uncached(self):
+        """Test growing texts tokenize the same with the prefix cache."""
+        cached = ARSLMTokenizer()
+        uncached = ARSLMTokenizer(cache_size=0, prefix_cache_size=0)
+
+        text = "You are ARSLM."
+        for turn in ["\nUser: hi!", " there,friend", "\nARSLM: hello.", "x"]:
+            text += turn
+            assert cached.tokenize(text) == uncached.tokenize(text)
+
+        assert len(cached._prefix_cache) > 0
+
+    def test_encode_cache_returns_copies(self, tokenizer):
+        """Test cached IDs cannot be modified through a returned list."""
+        first = tokenizer.encode("hello world", padding=False)
+        first.append(99)
+
+        assert tokenizer.encode("hello world", padding=False) == first[:-1]
+
+    def test_default_encode_matches_general_path(self, tokenizer):
+        """Test the default-options fast path equals the generic encode."""
+        for text in TEXTS * 2:
+            row = tokenizer.encode(text)
+            row[0] = -1
+
+            assert tokenizer.encode(text) == tokenizer.encode(
+                text, return_tensors="pt"
+            ).tolist()
+
+        tokenizer.max_length = 3
+        assert len(tokenizer.encode(TEXTS[1])) == 3
+
+    def test_build_vocab_clears_cache(self, tokenizer):
+        """Test token IDs follow a rebuilt vocabulary."""
+        before = tokenizer.encode("big", padding=False)
+        tokenizer.build_vocab(["big"], min_frequency=1)
+
+        assert tokenizer.encode("big", padding=False) != before
+
+
+class TestBatchEncode:
+    """Test ARSLMTokenizer.batch_encode."""
+
+    @pytest.mark.parametrize("add_special_tokens", [True, False])
+    def test_matches_encode(self, tokenizer, add_special_tokens):
+        """Test batch rows equal individually encoded texts."""
+        batch = tokenizer.batch_encode(
+            TEXTS, add_special_tokens=add_special_tokens
+        )
+        expected = torch.stack([
+            tokenizer.encode(
+                text,
+                add_special_tokens=add_special_tokens,
+                return_tensors="pt"
+            )
+            for text in TEXTS
+        ])
+
+        assert torch.equal(batch['input_ids'], expected)
+        assert torch.equal(
+            batch['attention_mask'],
+            (expected != tokenizer.pad_token_id).long()
+        )
+
+    def test_pads_to_longest_without_padding(self, tokenizer):
+        """Test padding=False pads only to the longest text."""
+        batch = tokenizer.batch_encode(
+            ["hello", "hello world"], padding=False
+        )
+
+        assert batch['input_ids'].shape == (2, 4)
+        assert batch['attention_mask'].tolist() == [[1, 1, 1, 0], [1, 1, 1, 1]]
+
+    def test_empty_batch(self, tokenizer):
+        """Test an empty batch gives empty tensors."""
+        batch = tokenizer.batch_encode([])
+
+        assert batch['input_ids'].shape == (0, 8)
+
+
+class TestDecode:
+    """Test ARSLMTokenizer.decode and batch_decode."""
+
+    def test_skips_special_and_maps_unknown(self, tokenizer):
+        """Test special tokens are dropped and unknown IDs become [UNK]."""
+        hello = tokenizer.vocab["hello"]
+        ids = [tokenizer.bos_token_id, hello, 10_000, -1, tokenizer.eos_token_id]
+
+        assert tokenizer.decode(ids) == "hello [UNK] [UNK]"
+        assert tokenizer.decode(ids * 10) == " ".join(["hello [UNK] [UNK]"] * 10)
+        assert tokenizer.decode(
+            torch.tensor(ids), skip_special_tokens=False
+        ) == "[BOS] hello [UNK] [UNK] [EOS]"
+
+    def test_reverse_vocab_list(self):
+        """Test id_to_token is a list with [UNK] in vocabulary gaps."""
+        vocab = {"[PAD]": 0, "[UNK]": 1, "[BOS]": 2, "[EOS]": 3, "[MASK]": 4, "hi": 7}
+        tokenizer = ARSLMTokenizer(vocab=vocab)
+
+        assert tokenizer.id_to_token[5:] == ["[UNK]", "[UNK]", "hi"]
+        assert tokenizer.decode([7, 6, 8]) == "hi [UNK] [UNK]"
+        assert tokenizer.decode([7, 6, 8] * 10) == " ".join(["hi [UNK] [UNK]"] * 10)
+
+    def test_batch_matches_decode(self, tokenizer):
+        """Test batch decoding equals decoding each row."""
+        batch = tokenizer.batch_encode(TEXTS)['input_ids']
+
+        for skip in (True, False):
+            assert tokenizer.batch_decode(batch, skip_special_tokens=skip) == [
+                tokenizer.decode(row, skip_special_tokens=skip)
+                for row in batch
+            ]
+
+        assert tokenizer.batch_decode([[2, 5], [5]]) == [
+            tokenizer.decode([5]), tokenizer.decode([5])
+        ]